@@ -3,11 +3,24 @@ from tkinter import scrolledtext, filedialog, messagebox, ttk, Scale
 import speech_recognition as sr
 from deep_translator import GoogleTranslator
 import threading
-import pyttsx3
 import time
 from datetime import datetime
 import sv_ttk
 
+from audio_processing import compact_audio_data
+from caches import SpeechCache, TranslationCache
+from live import (
+    OVERLOAD_POLICIES,
+    MicrophoneSource,
+    PhrasePipeline,
+    PhraseStats,
+    StreamingTranscriber,
+    merge_phrases,
+    recognize_phrase,
+)
+from recognizers import BACKENDS, GoogleBackend, create_backend
+from tts import SpeechWorker
+
 
 class SmoothTextWidget(scrolledtext.ScrolledText):
     def __init__(self, *args, **kwargs):
@@ -22,8 +35,26 @@ class SmoothTextWidget(scrolledtext.ScrolledText):
         self.tag_configure(
             "timestamp", foreground="#999999", font=("Segoe UI", 9, "italic")
         )
+        self.tag_configure("partial", foreground="#999999", font=("Segoe UI", 11))
+        self.partial = ""
+
+    def show_partial(self, text):
+        """Show a hypothesis for the phrase being spoken, replacing the last"""
+        self.clear_partial()
+        self.partial = text
+        self.insert(tk.END, text + "\n", "partial")
+        self.see(tk.END)
+
+    def clear_partial(self):
+        ranges = self.tag_ranges("partial")
+        if ranges:
+            self.delete(ranges[0], ranges[-1])
+        self.partial = ""
 
     def smooth_insert(self, text, duration=1000, step_count=20):
+        # Final text goes above the hypothesis still being spoken
+        partial = self.partial
+        self.clear_partial()
         lines = text.split("\n")
         for line in lines:
             if not line:
@@ -37,6 +68,8 @@ class SmoothTextWidget(scrolledtext.ScrolledText):
                 self.insert(tk.END, line.split("Urdu:")[1].strip() + "\n", "urdu")
             else:
                 self.insert(tk.END, line + "\n", "fade")
+        if partial:
+            self.show_partial(partial)
 
 
 class LiveSpeechToTextTranslatorApp:
@@ -48,15 +81,34 @@ class LiveSpeechToTextTranslatorApp:
 
         # Recognizer and translator
         self.recognizer = sr.Recognizer()
-        self.translator = GoogleTranslator()
+        self.backend = GoogleBackend()
+        self.translation_cache = TranslationCache()
         self.transcription_history = []
         self.continuous_mode = False
         self.current_lang = tk.StringVar(value="en-US")
-        self.tts_engine = pyttsx3.init()
+        # Speech runs on its own thread so the window never waits for audio
+        self.speech = SpeechWorker(
+            on_error=lambda e: self.root.after(
+                0, self.result_text.smooth_insert, f"Speech Error: {e}"
+            ),
+            cache=SpeechCache(),
+        )
 
         # Voice settings
         self.voice_rate = tk.IntVar(value=150)
         self.voice_volume = tk.DoubleVar(value=0.9)
+        self.interrupt_speech = tk.BooleanVar(value=False)
+
+        # Phrase pipeline settings
+        self.pool_size = tk.IntVar(value=2)
+        self.queue_depth = tk.IntVar(value=4)
+        self.overload_policy = tk.StringVar(value="drop_oldest")
+        self.streaming_mode = tk.BooleanVar(value=False)
+        self.phrases = None
+        self.phrase_stats = PhraseStats()
+        self.streamer = None
+        # Utterance the partial on screen belongs to
+        self.partial_index = None
 
         self.create_ui()
         sv_ttk.set_theme("light")
@@ -101,6 +153,20 @@ class LiveSpeechToTextTranslatorApp:
         )
         self.lang_btn.pack(pady=(0, 5), ipady=5)
 
+        # Recognizer backend selection
+        recognizer_row = ttk.Frame(lang_frame)
+        recognizer_row.pack(pady=(5, 0))
+        ttk.Label(recognizer_row, text="Recognizer:").pack(side=tk.LEFT, padx=5)
+        self.backend_choice = ttk.Combobox(
+            recognizer_row,
+            values=sorted(BACKENDS),
+            state="readonly",
+            width=12,
+        )
+        self.backend_choice.set(self.backend.name)
+        self.backend_choice.bind("<<ComboboxSelected>>", self.change_recognizer)
+        self.backend_choice.pack(side=tk.LEFT)
+
         # Voice settings
         voice_frame = ttk.LabelFrame(main_frame, text="🔊 Voice Settings", padding=15)
         voice_frame.pack(fill=tk.X, pady=(0, 15))
@@ -113,7 +179,6 @@ class LiveSpeechToTextTranslatorApp:
             from_=100,
             to=200,
             variable=self.voice_rate,
-            command=lambda v: self.tts_engine.setProperty("rate", int(float(v))),
         ).grid(row=0, column=1, sticky="ew", padx=5)
 
         ttk.Label(voice_frame, text="Volume:").grid(
@@ -126,12 +191,58 @@ class LiveSpeechToTextTranslatorApp:
             resolution=0.1,
             orient=tk.HORIZONTAL,
             variable=self.voice_volume,
-            command=lambda v: self.tts_engine.setProperty("volume", float(v)),
         ).grid(row=0, column=3, sticky="ew", padx=5)
 
+        ttk.Checkbutton(
+            voice_frame,
+            text="Cut off speech when a new translation arrives",
+            variable=self.interrupt_speech,
+        ).grid(row=1, column=0, columnspan=3, padx=5, pady=(10, 0), sticky=tk.W)
+
+        ttk.Button(
+            voice_frame, text="Pre-warm Phrases", command=self.prewarm_phrases
+        ).grid(row=1, column=3, padx=5, pady=(10, 0), sticky=tk.E)
+
         voice_frame.columnconfigure(1, weight=1)
         voice_frame.columnconfigure(3, weight=1)
 
+        # Phrase pipeline settings
+        pipeline_frame = ttk.LabelFrame(
+            main_frame, text="⚙ Processing Settings", padding=15
+        )
+        pipeline_frame.pack(fill=tk.X, pady=(0, 15))
+
+        ttk.Label(pipeline_frame, text="Workers:").grid(
+            row=0, column=0, padx=5, sticky=tk.W
+        )
+        ttk.Spinbox(
+            pipeline_frame, from_=1, to=8, textvariable=self.pool_size, width=5
+        ).grid(row=0, column=1, padx=5, sticky=tk.W)
+
+        ttk.Label(pipeline_frame, text="Queue Depth:").grid(
+            row=0, column=2, padx=5, sticky=tk.W
+        )
+        ttk.Spinbox(
+            pipeline_frame, from_=1, to=20, textvariable=self.queue_depth, width=5
+        ).grid(row=0, column=3, padx=5, sticky=tk.W)
+
+        ttk.Label(pipeline_frame, text="When Full:").grid(
+            row=0, column=4, padx=5, sticky=tk.W
+        )
+        ttk.Combobox(
+            pipeline_frame,
+            values=OVERLOAD_POLICIES,
+            textvariable=self.overload_policy,
+            state="readonly",
+            width=12,
+        ).grid(row=0, column=5, padx=5, sticky=tk.W)
+
+        ttk.Checkbutton(
+            pipeline_frame,
+            text="Streaming mode (show text while speaking)",
+            variable=self.streaming_mode,
+        ).grid(row=1, column=0, columnspan=6, padx=5, pady=(10, 0), sticky=tk.W)
+
         # Status
         self.status_frame = ttk.Frame(main_frame)
         self.status_frame.pack(fill=tk.X, pady=(0, 10))
@@ -212,6 +323,17 @@ Troubleshooting:
         self.lang_btn.config(
             text=f"🔁 Switch to {'Urdu' if new_lang == 'en-US' else 'English'}"
         )
+        if self.streamer:
+            self.streamer.language = new_lang
+
+    def change_recognizer(self, event=None):
+        name = self.backend_choice.get()
+        try:
+            self.backend = create_backend(name)
+            self.status_label.config(text=f"Recognizer switched to {name}")
+        except Exception as e:
+            self.backend_choice.set(self.backend.name)
+            messagebox.showerror("Recognizer Error", f"Could not load {name}: {e}")
 
     def toggle_theme(self):
         current = sv_ttk.get_theme()
@@ -221,15 +343,73 @@ Troubleshooting:
 
     def start_listening(self):
         if not self.continuous_mode:
+            try:
+                phrases = PhrasePipeline(
+                    self.process_phrase,
+                    self.on_phrase_done,
+                    workers=self.pool_size.get(),
+                    max_queue=self.queue_depth.get(),
+                    policy=self.overload_policy.get(),
+                    merge=merge_phrases,
+                )
+            except (tk.TclError, ValueError) as e:
+                messagebox.showerror("Settings Error", f"Invalid settings: {e}")
+                return
+            # Phrases still queued from the last session finish on the old pool
+            if self.phrases:
+                self.phrases.close()
+            self.phrases = phrases
             self.continuous_mode = True
             self.status_label.config(text="Status: Listening...")
             self.progress.start()
-            threading.Thread(target=self.background_listen, daemon=True).start()
+            if self.streaming_mode.get():
+                self.start_streaming()
+            else:
+                threading.Thread(target=self.background_listen, daemon=True).start()
+
+    def start_streaming(self):
+        """Listen continuously, showing partial text until each phrase ends"""
+        streamer = StreamingTranscriber(
+            MicrophoneSource(),
+            self.backend,
+            self.current_lang.get(),
+            on_utterance=self.on_utterance,
+            on_partial=lambda index, text: self.root.after(
+                0, self.show_partial, index, text
+            ),
+            on_error=lambda e: self.root.after(0, self.streaming_failed, streamer, e),
+        )
+        self.streamer = streamer
+        streamer.start()
+
+    def streaming_failed(self, streamer, error):
+        self.result_text.smooth_insert(f"Error: {error}")
+        # A later session may already have replaced the one that failed
+        if streamer is self.streamer:
+            self.stop_listening()
+
+    def on_utterance(self, index, audio):
+        # Only finished phrases are translated
+        self.phrases.submit((audio, self.current_lang.get()))
+        self.root.after(0, self.update_queue_status)
+
+    def show_partial(self, index, text):
+        if self.streamer and index >= self.streamer.utterances:
+            self.partial_index = index
+            self.result_text.show_partial(text)
 
     def stop_listening(self):
         if self.continuous_mode:
             self.continuous_mode = False
-            self.status_label.config(text="Status: Ready")
+            if self.streamer:
+                self.streamer.stop()
+                self.streamer = None
+            self.status_label.config(
+                text=f"Status: Ready ({self.phrase_stats.summary()}; "
+                f"translation cache: {self.translation_cache.hits} hits, "
+                f"{self.translation_cache.misses} misses; "
+                f"speech: {self.speech.summary()})"
+            )
             self.progress.stop()
 
     def background_listen(self):
@@ -240,59 +420,99 @@ Troubleshooting:
                     audio = self.recognizer.listen(
                         source, timeout=3, phrase_time_limit=8
                     )
-                    threading.Thread(
-                        target=self.process_audio, args=(audio,), daemon=True
-                    ).start()
+                    self.phrases.submit(
+                        (compact_audio_data(audio), self.current_lang.get())
+                    )
+                    self.root.after(0, self.update_queue_status)
                 except sr.WaitTimeoutError:
                     continue
                 except Exception as e:
                     self.root.after(0, self.result_text.smooth_insert, f"Error: {e}")
 
-    def process_audio(self, audio):
-        try:
-            current_lang = self.current_lang.get()
-            target_lang = "ur" if current_lang == "en-US" else "en"
-
-            retry_count = 3
-            recognized = None
-            for _ in range(retry_count):
-                try:
-                    recognized = self.recognizer.recognize_google(
-                        audio, language=current_lang
-                    )
-                    break
-                except sr.UnknownValueError:
-                    continue
+    def process_phrase(self, phrase):
+        """Recognize and translate one phrase on a pool worker"""
+        audio, current_lang = phrase
+        target_lang = "ur" if current_lang == "en-US" else "en"
 
-            if recognized:
-                translated_text = self.translator.translate(
-                    recognized,
-                    source="en" if current_lang == "en-US" else "ur",
-                    target=target_lang,
-                )
+        recognized = recognize_phrase(
+            self.backend, audio, current_lang, self.phrase_stats
+        )
+        if not recognized:
+            return None
+        source_lang = "en" if current_lang == "en-US" else "ur"
+        translated_text = self.translation_cache.translate(
+            recognized,
+            source_lang,
+            target_lang,
+            GoogleTranslator(source=source_lang, target=target_lang).translate,
+        )
 
-                timestamp = time.strftime("%H:%M:%S")
-                original_label = "English:" if current_lang == "en-US" else "Urdu:"
-                translated_label = "Urdu:" if target_lang == "ur" else "English:"
-                formatted_result = (
-                    f"[{timestamp}] {original_label} {recognized}\n"
-                    f"[{timestamp}] {translated_label} {translated_text}\n"
-                )
+        timestamp = time.strftime("%H:%M:%S")
+        original_label = "English:" if current_lang == "en-US" else "Urdu:"
+        translated_label = "Urdu:" if target_lang == "ur" else "English:"
+        formatted_result = (
+            f"[{timestamp}] {original_label} {recognized}\n"
+            f"[{timestamp}] {translated_label} {translated_text}\n"
+        )
+        return formatted_result, translated_text
+
+    def on_phrase_done(self, result):
+        # Called in capture order, so phrases are shown and spoken in order
+        self.root.after(0, self.show_result, result)
+
+    def show_result(self, result):
+        # The final text replaces the partial of a finished utterance
+        if self.partial_index is not None and (
+            not self.streamer or self.partial_index < self.streamer.utterances
+        ):
+            self.result_text.clear_partial()
+            self.partial_index = None
+        if isinstance(result, sr.RequestError):
+            self.result_text.smooth_insert(f"API Error: {result}")
+        elif isinstance(result, Exception):
+            self.result_text.smooth_insert(f"Error: {result}")
+        elif result:
+            formatted_result, translated_text = result
+            self.result_text.smooth_insert(formatted_result)
+            self.transcription_history.append(formatted_result)
+            self.speak_text(translated_text)
+        self.update_queue_status()
+
+    def update_queue_status(self):
+        if not self.continuous_mode or not self.phrases:
+            return
+        phrases = self.phrases
+        text = (
+            f"Status: Listening... ({phrases.waiting}/{phrases.max_queue} queued, "
+            f"{phrases.active} processing"
+        )
+        if phrases.dropped:
+            text += f", {phrases.dropped} dropped"
+        if phrases.merged:
+            text += f", {phrases.merged} merged"
+        if self.speech.waiting:
+            text += f", {self.speech.waiting} to speak"
+        self.status_label.config(text=text + ")")
 
-                self.root.after(0, self.result_text.smooth_insert, formatted_result)
-                self.transcription_history.append(formatted_result)
-                self.root.after(0, self.speak_text, translated_text)
+    def speak_text(self, text):
+        self.speech.interrupt = self.interrupt_speech.get()
+        self.speech.speak(text, self.voice_rate.get(), self.voice_volume.get())
 
-        except sr.RequestError as e:
-            self.root.after(0, self.result_text.smooth_insert, f"API Error: {e}")
+    def prewarm_phrases(self):
+        """Synthesize a list of stock phrases, one per line, ahead of time"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                phrases = [line.strip() for line in f if line.strip()]
         except Exception as e:
-            self.root.after(0, self.result_text.smooth_insert, f"Error: {e}")
-
-    def speak_text(self, text):
-        self.tts_engine.setProperty("rate", self.voice_rate.get())
-        self.tts_engine.setProperty("volume", self.voice_volume.get())
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+            messagebox.showerror("Pre-warm Error", f"Error reading phrases: {e}")
+            return
+        self.speech.prewarm(phrases, self.voice_rate.get(), self.voice_volume.get())
+        self.status_label.config(text=f"Status: Pre-warming {len(phrases)} phrases")
 
     def save_transcript(self):
         file_path = filedialog.asksaveasfilename(
@@ -2,18 +2,27 @@ import tkinter as tk
 import customtkinter as ctk
 from tkinter import filedialog
 from tkinterdnd2 import DND_FILES, TkinterDnD
-import concurrent.futures
-from moviepy import VideoFileClip
-from pydub import AudioSegment
-import speech_recognition as sr
+import collections
 import os
-import datetime
 import pygame
-from deep_translator import GoogleTranslator
 import threading
 
+from pipeline import TranscriptionPipeline, find_videos, format_time
+from caches import RecognitionCache, TranslationCache
+from recognizers import create_backend
+from scheduler import JobScheduler
+from transcript import export_transcript
+from translation import translate_segments
+
 ctk.set_default_color_theme("blue")
 
+LANGUAGES = ["Spanish", "French", "German", "Urdu", "Arabic", "Hindi"]
+
+RECOGNIZER_CHOICES = {"Google": "google", "Offline (Vosk)": "vosk", "Stub": "stub"}
+
+# Worker results are drawn in batches at most this often
+UI_REFRESH_MS = 100
+
 
 class VideoToTextTranslatorApp(TkinterDnD.Tk):
     def __init__(self):
@@ -84,11 +93,29 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         self.status_bar.grid(row=2, column=0, sticky="ew", padx=10, pady=10)
 
         # Initialize variables
-        self.chunk_total = 0
-        self.chunk_done = 0
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
-        self.translations = {}
-        self.translated_text = ""
+        self.translation_cache = TranslationCache()
+        self.pipeline = TranscriptionPipeline(
+            max_workers=32,
+            recognition_cache=RecognitionCache(),
+            translation_cache=self.translation_cache,
+        )
+        self.scheduler = JobScheduler(
+            self.pipeline,
+            on_result=self.on_chunk_result,
+            on_translation=self.on_chunk_translation,
+            on_job_done=self.on_job_done,
+        )
+        # The job shown in the text boxes, and how much of it is shown
+        self.job = None
+        self.shown_results = 0
+        self.shown_translations = 0
+        self.job_labels = []
+        self.finished_jobs = set()
+        # Filled by worker threads, drained by refresh_ui on the Tk thread
+        self.pending_results = collections.deque()
+        self.pending_translations = collections.deque()
+        self.shown_progress = None
+        self.after(UI_REFRESH_MS, self.refresh_ui)
 
         pygame.mixer.init()
 
@@ -106,7 +133,7 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         # Drag area (left side)
         self.drop_area = ctk.CTkLabel(
             self.file_frame,
-            text="📁 Drag & Drop Video File Here",
+            text="📁 Drag & Drop Videos or a Folder Here",
             height=100,
             corner_radius=8,
             font=ctk.CTkFont(size=16, weight="bold"),
@@ -129,7 +156,7 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         # Browse button (right side)
         self.select_button = ctk.CTkButton(
             self.file_frame,
-            text="Browse Video File",
+            text="Browse Video Files",
             command=self.handle_video_selection,
             height=100,  # Match drop area height
             font=ctk.CTkFont(size=14, weight="bold"),
@@ -142,6 +169,26 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         self.progress_frame = ctk.CTkFrame(tab, corner_radius=8)
         self.progress_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 15))
 
+        # Job queue controls
+        self.job_frame = ctk.CTkFrame(self.progress_frame, fg_color="transparent")
+        self.job_frame.pack(fill="x", pady=(10, 0), padx=10)
+        self.job_frame.grid_columnconfigure(0, weight=1)
+
+        self.job_selector = ctk.CTkOptionMenu(
+            self.job_frame, values=["No jobs"], command=self.on_job_selected
+        )
+        self.job_selector.grid(row=0, column=0, sticky="ew")
+
+        self.cancel_button = ctk.CTkButton(
+            self.job_frame, text="Cancel Job", width=110, command=self.cancel_job
+        )
+        self.cancel_button.grid(row=0, column=1, padx=(10, 0))
+
+        self.resume_button = ctk.CTkButton(
+            self.job_frame, text="Resume Run", width=110, command=self.resume_run
+        )
+        self.resume_button.grid(row=0, column=2, padx=(10, 0))
+
         self.progress_bar = ctk.CTkProgressBar(
             self.progress_frame, mode="determinate", height=20, corner_radius=10
         )
@@ -223,7 +270,8 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
 
         self.language_option = ctk.CTkOptionMenu(
             self.translation_controls,
-            values=["Spanish", "French", "German", "Urdu", "Arabic", "Hindi"],
+            values=LANGUAGES,
+            command=self.show_translation,
             dynamic_resizing=False,
             width=120,
         )
@@ -287,9 +335,149 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         )
         worker_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
 
-        self.worker_threads = ctk.CTkEntry(self.settings_form, placeholder_text="8")
+        self.worker_threads = ctk.CTkEntry(self.settings_form, placeholder_text="32")
         self.worker_threads.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
 
+        # Recognizer settings
+        recognizer_label = ctk.CTkLabel(
+            self.settings_form, text="Recognizer:", font=ctk.CTkFont(size=14)
+        )
+        recognizer_label.grid(row=2, column=0, padx=10, pady=10, sticky="w")
+
+        self.recognizer_option = ctk.CTkOptionMenu(
+            self.settings_form, values=list(RECOGNIZER_CHOICES)
+        )
+        self.recognizer_option.set("Google")
+        self.recognizer_option.grid(row=2, column=1, padx=10, pady=10, sticky="ew")
+
+        model_label = ctk.CTkLabel(
+            self.settings_form, text="Vosk Model Path:", font=ctk.CTkFont(size=14)
+        )
+        model_label.grid(row=3, column=0, padx=10, pady=10, sticky="w")
+
+        self.model_path = ctk.CTkEntry(self.settings_form, placeholder_text="model")
+        self.model_path.grid(row=3, column=1, padx=10, pady=10, sticky="ew")
+
+        # Segmentation settings
+        segmentation_label = ctk.CTkLabel(
+            self.settings_form, text="Segmentation:", font=ctk.CTkFont(size=14)
+        )
+        segmentation_label.grid(row=4, column=0, padx=10, pady=10, sticky="w")
+
+        self.segmentation = ctk.CTkOptionMenu(
+            self.settings_form, values=["Fixed chunks", "Cut on pauses"]
+        )
+        self.segmentation.set("Fixed chunks")
+        self.segmentation.grid(row=4, column=1, padx=10, pady=10, sticky="ew")
+
+        min_segment_label = ctk.CTkLabel(
+            self.settings_form, text="Min Segment (ms):", font=ctk.CTkFont(size=14)
+        )
+        min_segment_label.grid(row=5, column=0, padx=10, pady=10, sticky="w")
+
+        self.min_segment = ctk.CTkEntry(self.settings_form, placeholder_text="2000")
+        self.min_segment.grid(row=5, column=1, padx=10, pady=10, sticky="ew")
+
+        max_segment_label = ctk.CTkLabel(
+            self.settings_form, text="Max Segment (ms):", font=ctk.CTkFont(size=14)
+        )
+        max_segment_label.grid(row=6, column=0, padx=10, pady=10, sticky="w")
+
+        self.max_segment = ctk.CTkEntry(self.settings_form, placeholder_text="15000")
+        self.max_segment.grid(row=6, column=1, padx=10, pady=10, sticky="ew")
+
+        # Silence gate setting
+        silence_label = ctk.CTkLabel(
+            self.settings_form,
+            text="Silence Threshold (dBFS):",
+            font=ctk.CTkFont(size=14),
+        )
+        silence_label.grid(row=7, column=0, padx=10, pady=10, sticky="w")
+
+        self.silence_threshold = ctk.CTkEntry(
+            self.settings_form, placeholder_text="-45"
+        )
+        self.silence_threshold.grid(row=7, column=1, padx=10, pady=10, sticky="ew")
+
+        # Debug chunk files setting
+        self.keep_chunks = ctk.CTkCheckBox(
+            self.settings_form,
+            text="Write chunk WAV files (debug)",
+            font=ctk.CTkFont(size=14),
+        )
+        self.keep_chunks.grid(
+            row=8, column=0, columnspan=2, padx=10, pady=10, sticky="w"
+        )
+
+        # Streaming extraction setting
+        self.stream_audio = ctk.CTkCheckBox(
+            self.settings_form,
+            text="Stream audio extraction",
+            font=ctk.CTkFont(size=14),
+        )
+        self.stream_audio.select()
+        self.stream_audio.grid(
+            row=9, column=0, columnspan=2, padx=10, pady=10, sticky="w"
+        )
+
+        # Pipelined translation setting
+        pipelined_label = ctk.CTkLabel(
+            self.settings_form,
+            text="Translate While Transcribing:",
+            font=ctk.CTkFont(size=14),
+        )
+        pipelined_label.grid(row=10, column=0, padx=10, pady=10, sticky="w")
+
+        pipelined_frame = ctk.CTkFrame(self.settings_form, fg_color="transparent")
+        pipelined_frame.grid(row=10, column=1, padx=10, pady=10, sticky="w")
+        self.pipelined_langs = {}
+        for i, lang in enumerate(LANGUAGES):
+            checkbox = ctk.CTkCheckBox(pipelined_frame, text=lang, width=90)
+            checkbox.grid(row=i // 3, column=i % 3, padx=5, pady=5, sticky="w")
+            self.pipelined_langs[lang] = checkbox
+
+        # Request control settings
+        self.adaptive = ctk.CTkCheckBox(
+            self.settings_form,
+            text="Adapt concurrency to the recognizer",
+            font=ctk.CTkFont(size=14),
+        )
+        self.adaptive.select()
+        self.adaptive.grid(row=11, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+
+        rate_label = ctk.CTkLabel(
+            self.settings_form, text="Requests per Second:", font=ctk.CTkFont(size=14)
+        )
+        rate_label.grid(row=12, column=0, padx=10, pady=10, sticky="w")
+
+        self.rate_limit = ctk.CTkEntry(self.settings_form, placeholder_text="unlimited")
+        self.rate_limit.grid(row=12, column=1, padx=10, pady=10, sticky="ew")
+
+        retries_label = ctk.CTkLabel(
+            self.settings_form, text="Request Retries:", font=ctk.CTkFont(size=14)
+        )
+        retries_label.grid(row=13, column=0, padx=10, pady=10, sticky="w")
+
+        self.max_retries = ctk.CTkEntry(self.settings_form, placeholder_text="3")
+        self.max_retries.grid(row=13, column=1, padx=10, pady=10, sticky="ew")
+
+        hedge_label = ctk.CTkLabel(
+            self.settings_form,
+            text="Hedge After Percentile:",
+            font=ctk.CTkFont(size=14),
+        )
+        hedge_label.grid(row=14, column=0, padx=10, pady=10, sticky="w")
+
+        self.hedge_percentile = ctk.CTkEntry(self.settings_form, placeholder_text="off")
+        self.hedge_percentile.grid(row=14, column=1, padx=10, pady=10, sticky="ew")
+
+        self.limit_label = ctk.CTkLabel(
+            self.settings_form, text="Current limit: -", font=ctk.CTkFont(size=14)
+        )
+        self.limit_label.grid(
+            row=15, column=0, columnspan=2, padx=10, pady=10, sticky="w"
+        )
+
         # Save button
         save_btn = ctk.CTkButton(
             self.settings_container,
@@ -311,11 +499,13 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         """Update both status systems for compatibility"""
         self.status_bar.configure(text=message)
 
-    def update_progress(self):
-        if self.chunk_total:
-            percent = self.chunk_done / self.chunk_total
+    def update_progress(self, job):
+        done, total, _ = job.progress.snapshot()
+        if total and (job, done, total) != self.shown_progress:
+            self.shown_progress = (job, done, total)
+            percent = done / total
             self.progress_bar.set(percent)
-            progress_text = f"{int(percent*100)}% - {self.chunk_done}/{self.chunk_total} chunks processed"
+            progress_text = f"{int(percent*100)}% - {done}/{total} chunks processed"
             self.progress_text.configure(text=progress_text)
             self.update_status(progress_text)
 
@@ -331,124 +521,289 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
         try:
             new_chunk_size = int(self.chunk_size.get())
             new_workers = int(self.worker_threads.get())
-            self.executor = concurrent.futures.ThreadPoolExecutor(
-                max_workers=new_workers
+            self.pipeline.chunk_duration_ms = new_chunk_size
+            self.pipeline.keep_chunk_files = bool(self.keep_chunks.get())
+            self.pipeline.stream_audio = bool(self.stream_audio.get())
+            self.pipeline.translate_to = [
+                lang
+                for lang, checkbox in self.pipelined_langs.items()
+                if checkbox.get()
+            ]
+            self.pipeline.segmentation = (
+                "pauses" if self.segmentation.get() == "Cut on pauses" else "fixed"
+            )
+            if self.min_segment.get():
+                self.pipeline.min_segment_ms = int(self.min_segment.get())
+            if self.max_segment.get():
+                self.pipeline.max_segment_ms = int(self.max_segment.get())
+            if self.silence_threshold.get():
+                self.pipeline.silence_threshold_db = float(self.silence_threshold.get())
+            self.pipeline.adaptive = bool(self.adaptive.get())
+            self.pipeline.rate_limit = (
+                float(self.rate_limit.get()) if self.rate_limit.get() else None
+            )
+            if self.max_retries.get():
+                self.pipeline.max_retries = int(self.max_retries.get())
+            self.pipeline.hedge_percentile = (
+                int(self.hedge_percentile.get())
+                if self.hedge_percentile.get()
+                else None
             )
+            self.pipeline.resize(new_workers)
+            self.set_recognizer()
             self.update_status(
                 f"Settings saved: Chunk size={new_chunk_size}ms, Workers={new_workers}"
             )
         except ValueError:
             self.update_status("Invalid settings values")
+        except Exception as e:
+            self.log(f"Recognizer error: {e}")
+            self.update_status("Could not load recognizer")
+
+    def set_recognizer(self):
+        name = RECOGNIZER_CHOICES[self.recognizer_option.get()]
+        options = {}
+        if name == "vosk":
+            options["model_path"] = self.model_path.get() or "model"
+        backend = self.pipeline.backend
+        if name == backend.name and options.get("model_path") == getattr(
+            backend, "model_path", None
+        ):
+            return
+        self.pipeline.backend = create_backend(name, **options)
 
     def drop_video(self, event):
-        video_path = event.data.strip("{}")
-        self.start_transcription(video_path)
+        self.queue_videos(self.tk.splitlist(event.data))
 
     def handle_video_selection(self):
-        video_path = filedialog.askopenfilename(
-            title="Select a Video File",
+        video_paths = filedialog.askopenfilenames(
+            title="Select Video Files",
             filetypes=[("Video Files", "*.mp4 *.mkv *.avi *.mov *.flv")],
         )
-        if video_path:
-            self.start_transcription(video_path)
+        if video_paths:
+            self.queue_videos(video_paths)
 
-    def start_transcription(self, video_path):
+    def queue_videos(self, paths):
+        videos = find_videos(paths)
+        if not videos:
+            self.update_status("No video files found")
+            return
+        for video_path in videos:
+            job = self.scheduler.submit(video_path)
+            self.log(f"Queued video file: {video_path}")
+            if self.job is None or self.job.state not in ("queued", "running"):
+                self.select_job(job)
+        self.update_jobs()
+
+    def resume_run(self):
+        run_dir = filedialog.askdirectory(
+            title="Select an Interrupted Run",
+            initialdir=self.pipeline.base_output_dir,
+        )
+        if not run_dir:
+            return
+        try:
+            job = self.scheduler.resume(run_dir)
+        except Exception as e:
+            self.log(f"Could not resume {run_dir}: {e}")
+            self.update_status("Could not resume that run")
+            return
+        self.log(f"Resuming {job.video_path}: {len(job.completed)} chunks already done")
+        if self.job is None or self.job.state not in ("queued", "running"):
+            self.select_job(job)
+        self.update_jobs()
+
+    def select_job(self, job):
+        """Show ``job`` in the text boxes, redrawing what it has so far"""
+        self.job = job
+        self.shown_progress = None
+        self.progress_bar.set(0)
+        self.progress_text.configure(text="0%")
         self.result_text.delete("1.0", tk.END)
         self.translation_text.delete("1.0", tk.END)
-        self.translations.clear()
-        self.translated_text = ""
-        self.log(f"Selected video file: {video_path}")
-        threading.Thread(
-            target=self.process_video, args=(video_path,), daemon=True
-        ).start()
+        segments = []
+        # Results are delivered in order, so draw only the finished prefix
+        for segment in job.transcript.ordered():
+            if segment.text is None:
+                break
+            segments.append(segment)
+        self.shown_results = len(segments)
+        self.result_text.insert(tk.END, "".join(map(self.format_result, segments)))
+        self.shown_translations = 0
+        target_lang = self.language_option.get()
+        if target_lang in job.transcript.languages:
+            self.show_translation(target_lang)
+
+    def on_job_selected(self, label):
+        if label in self.job_labels:
+            self.select_job(self.scheduler.jobs[self.job_labels.index(label)])
+
+    def cancel_job(self):
+        if self.job and self.job.state in ("queued", "running"):
+            self.scheduler.cancel(self.job)
+            self.log(f"Cancelled {self.job.video_path}")
+
+    def on_job_done(self, job):
+        self.after(0, self.job_finished, job)
+
+    def job_finished(self, job):
+        if job.error:
+            self.log(f"Error: {job.video_path}: {job.error}")
+            if job is self.job:
+                self.update_status("Failed during transcription.")
+        else:
+            self.log(f"{job.video_path}: {job.state}")
+        # Follow the queue unless the user is looking at another running job
+        if job is self.job:
+            for next_job in self.scheduler.jobs:
+                if next_job.state in ("queued", "running"):
+                    self.select_job(next_job)
+                    break
+        self.update_jobs()
+
+    def update_jobs(self):
+        labels = [
+            f"{number}. {os.path.basename(job.video_path)} ({job.state})"
+            for number, job in enumerate(self.scheduler.jobs, 1)
+        ]
+        if labels != self.job_labels:
+            self.job_labels = labels
+            self.job_selector.configure(values=labels)
+        if self.job:
+            label = self.job_labels[self.scheduler.jobs.index(self.job)]
+            if self.job_selector.get() != label:
+                self.job_selector.set(label)
 
     def log(self, msg):
         self.log_text.insert(tk.END, f"{msg}\n")
         self.log_text.see(tk.END)
         print(msg)
 
-    def process_video(self, video_path):
-        try:
-            self.progress_bar.set(0)
-            self.chunk_done = 0
-            self.update_status("Extracting audio...")
-
-            base_output_dir = "Video Chunks Outputs"
-            os.makedirs(base_output_dir, exist_ok=True)
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            self.output_dir = os.path.join(base_output_dir, f"Run_{timestamp}")
-            os.makedirs(self.output_dir)
-
-            video = VideoFileClip(video_path)
-            audio_path = os.path.join(self.output_dir, "temp_audio.wav")
-            video.audio.write_audiofile(audio_path, codec="pcm_s16le")
-
-            chunk_size = int(self.chunk_size.get()) if self.chunk_size.get() else 5000
-            chunks = self.chunk_audio(audio_path, self.output_dir, chunk_size)
-            self.chunk_total = len(chunks)
+    def on_chunk_result(self, job, index, text):
+        self.pending_results.append((job, index, text))
 
-            self.log(f"{self.chunk_total} chunks to process.")
+    def on_chunk_translation(self, job, index, target_lang, text):
+        self.pending_translations.append((job, index, target_lang, text))
 
-            for idx, chunk in enumerate(chunks):
-                self.executor.submit(self.recognize_audio, chunk, idx)
-
-        except Exception as e:
-            self.result_text.insert(tk.END, f"Error: {e}\n")
-            self.log(f"Error: {e}")
-            self.update_status("Failed during transcription.")
-
-    def chunk_audio(self, audio_path, output_dir, chunk_duration_ms=5000):
-        audio = AudioSegment.from_wav(audio_path)
-        chunks = []
-        for start_ms in range(0, len(audio), chunk_duration_ms):
-            end_ms = min(start_ms + chunk_duration_ms, len(audio))
-            chunk = audio[start_ms:end_ms]
-            chunk_filename = os.path.join(output_dir, f"chunk_{start_ms // 1000}.wav")
-            chunk.export(chunk_filename, format="wav")
-            chunks.append(chunk_filename)
-        return chunks
-
-    def recognize_audio(self, path, index):
-        recognizer = sr.Recognizer()
+    def refresh_ui(self):
+        """Draw everything the workers queued since the last refresh at once"""
         try:
-            with sr.AudioFile(path) as source:
-                audio = recognizer.record(source)
-                text = recognizer.recognize_google(audio)
-        except sr.UnknownValueError:
-            text = "[Unintelligible audio]"
-        except sr.RequestError as e:
-            text = f"[API error: {e}]"
+            self.flush_results()
+            self.flush_translations()
+            if self.job:
+                self.update_progress(self.job)
+                self.check_complete(self.job)
+            self.update_jobs()
+            self.update_limit()
         except Exception as e:
-            text = f"[Error: {e}]"
-
-        self.chunk_done += 1
-        self.translations[index] = text
-        self.after(0, self.update_progress)
-        self.after(0, self.append_result, index, text)
-
-    def append_result(self, index, text):
-        self.result_text.insert(tk.END, f"Chunk {index} Result:\n{text}\n\n")
-        self.result_text.see(tk.END)
-        self.log(f"Chunk {index} complete.")
-        if self.chunk_done == self.chunk_total:
+            self.log(f"UI update error: {e}")
+        finally:
+            self.after(UI_REFRESH_MS, self.refresh_ui)
+
+    def update_limit(self):
+        limiter = self.pipeline.limiter
+        text = (
+            f"Current limit: {limiter.limit} of {limiter.maximum} "
+            f"({limiter.in_flight} in flight, {self.pipeline.retries} retries"
+        )
+        hedger = self.pipeline.hedger
+        if hedger:
+            text += f", {hedger.hedges} of {hedger.calls} calls hedged"
+        self.limit_label.configure(text=text + ")")
+
+    def flush_results(self):
+        if not self.pending_results:
+            return
+        results = []
+        log_lines = []
+        while self.pending_results:
+            job, index, text = self.pending_results.popleft()
+            name = os.path.basename(job.video_path)
+            if text == "[Silence]":
+                log_lines.append(f"{name}: chunk {index} is silent, skipped.")
+            else:
+                log_lines.append(f"{name}: chunk {index} complete.")
+            # select_job may already have drawn this result
+            if job is self.job and index >= self.shown_results:
+                results.append(self.format_result(job.transcript[index]))
+                self.shown_results = index + 1
+        if results:
+            self.result_text.insert(tk.END, "".join(results))
+            self.result_text.see(tk.END)
+        self.log("\n".join(log_lines))
+
+    def format_result(self, segment):
+        return (
+            f"Chunk {segment.index} Result ({format_time(segment.start_ms)} - "
+            f"{format_time(segment.end_ms)}):\n{segment.text}\n\n"
+        )
+
+    def flush_translations(self):
+        if not self.pending_translations:
+            return
+        translations = []
+        while self.pending_translations:
+            job, index, target_lang, text = self.pending_translations.popleft()
+            if job is not self.job or index < self.shown_translations:
+                continue
+            if self.language_option.get() == "Select language":
+                self.language_option.set(target_lang)
+            if target_lang == self.language_option.get():
+                translations.append(f"Chunk {index}:\n{text}\n\n")
+                self.shown_translations = index + 1
+        if translations:
+            self.translation_text.insert(tk.END, "".join(translations))
+            self.translation_text.see(tk.END)
+
+    def show_translation(self, target_lang):
+        """Show the pipelined translation for ``target_lang`` if there is one"""
+        if not self.job or target_lang not in self.job.transcript.languages:
+            return
+        translations = []
+        for segment in self.job.transcript.ordered():
+            if target_lang not in segment.translations:
+                break
+            translations.append(
+                f"Chunk {segment.index}:\n{segment.translations[target_lang]}\n\n"
+            )
+        self.shown_translations = len(translations)
+        self.translation_text.delete("1.0", tk.END)
+        self.translation_text.insert(tk.END, "".join(translations))
+
+    def check_complete(self, job):
+        if job.complete and not job.error and job not in self.finished_jobs:
+            self.finished_jobs.add(job)
+            self.log(f"Skipped {job.skipped} of {job.chunk_total} chunks as silence.")
+            self.log(f"Reused {job.cached} chunks from the recognition cache.")
+            if job.resumed:
+                self.log(f"Resumed {job.resumed} chunks from the run manifest.")
             self.update_status("Transcription complete!")
 
     def translate_text(self):
         target_lang = self.language_option.get()
         if target_lang == "Select language":
             return
+        if self.job and target_lang in self.job.transcript.languages:
+            self.show_translation(target_lang)
+            return
 
         try:
-            full_text = self.result_text.get("1.0", tk.END).strip()
-            if not full_text:
+            if self.job:
+                segments = self.job.transcript.texts()
+            else:
+                full_text = self.result_text.get("1.0", tk.END).strip()
+                segments = [p for p in full_text.split("\n\n") if p.strip()]
+            if not segments:
                 return
 
             self.translate_button.configure(state="disabled", text="Translating...")
             self.update_status(f"Translating to {target_lang}...")
 
+            # The job is fixed now; another one may be selected by the time
+            # the translation is done
             threading.Thread(
                 target=self._perform_translation,
-                args=(full_text, target_lang),
+                args=(self.job, segments, target_lang),
                 daemon=True,
             ).start()
 
@@ -457,28 +812,29 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
             self.update_status("Translation failed to start")
             self.translate_button.configure(state="normal", text="Translate")
 
-    def _perform_translation(self, text, target_lang):
+    def _perform_translation(self, job, segments, target_lang):
         try:
-            lang_code = (
-                GoogleTranslator()
-                .get_supported_languages(as_dict=True)
-                .get(target_lang.lower(), target_lang.lower())
-            )
-            translated = GoogleTranslator(source="auto", target=lang_code).translate(
-                text
+            translated = translate_segments(
+                segments, target_lang, self.translation_cache
             )
 
-            self.after(0, self._update_translation_ui, translated, target_lang)
+            self.after(0, self._update_translation_ui, job, translated, target_lang)
 
         except Exception as e:
             self.after(0, self._handle_translation_error, e)
 
-    def _update_translation_ui(self, translated_text, target_lang):
-        self.translated_text = translated_text
-        self.translation_text.delete("1.0", tk.END)
-        self.translation_text.insert(tk.END, translated_text)
+    def _update_translation_ui(self, job, translated, target_lang):
+        if job:
+            job.transcript.set_translations(target_lang, translated)
+        if job is self.job:
+            self.translation_text.delete("1.0", tk.END)
+            self.translation_text.insert(tk.END, "\n\n".join(translated))
         self.translate_button.configure(state="normal", text="Translate")
         self.update_status(f"Translated to {target_lang}")
+        self.log(
+            f"Translation cache: {self.translation_cache.hits} hits, "
+            f"{self.translation_cache.misses} misses"
+        )
 
     def _handle_translation_error(self, error):
         self.translation_text.insert(tk.END, f"Error during translation: {error}")
@@ -488,24 +844,15 @@ class VideoToTextTranslatorApp(TkinterDnD.Tk):
 
     def export_transcripts(self):
         try:
-            if not hasattr(self, "output_dir"):
+            if not self.job or not self.job.output_dir:
                 return
 
-            english_path = os.path.join(self.output_dir, "transcription_english.txt")
-            with open(english_path, "w", encoding="utf-8") as f:
-                f.write(self.result_text.get("1.0", tk.END))
-
-            if self.translated_text:
-                target_lang = self.language_option.get()
-                if target_lang != "Select language":
-                    translated_path = os.path.join(
-                        self.output_dir, f"transcription_{target_lang.lower()}.txt"
-                    )
-                    with open(translated_path, "w", encoding="utf-8") as f:
-                        f.write(self.translated_text)
-
-            self.log("Transcriptions exported")
-            self.update_status(f"Transcripts saved to {self.output_dir}")
+            paths = export_transcript(
+                self.job.transcript, os.path.join(self.job.output_dir, "transcription")
+            )
+
+            self.log(f"Exported {len(paths)} transcript files")
+            self.update_status(f"Transcripts saved to {self.job.output_dir}")
         except Exception as e:
             self.log(f"Export error: {e}")
             self.update_status("Export failed")
@@ -0,0 +1,292 @@
+import subprocess
+import tempfile
+import wave
+
+from moviepy.config import FFMPEG_BINARY
+import numpy as np
+from pydub import AudioSegment
+import speech_recognition as sr
+
+# Recognizers gain nothing above 16 kHz mono, so audio is normalized to it once
+SPEECH_SAMPLE_RATE = 16000
+
+
+class AudioChunk:
+    """A window of mono PCM audio, usually a view into a larger buffer"""
+
+    __slots__ = (
+        "index",
+        "start_ms",
+        "end_ms",
+        "data",
+        "sample_rate",
+        "sample_width",
+        "flac",
+    )
+
+    def __init__(self, index, start_ms, end_ms, data, sample_rate, sample_width):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.data = data
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        # FLAC payloads encoded ahead of time: {(convert_rate, convert_width): bytes}
+        self.flac = None
+
+    def to_audio_data(self):
+        audio = CompactAudioData(
+            self.data.tobytes(), self.sample_rate, self.sample_width
+        )
+        if self.flac:
+            audio._flac_cache.update(self.flac)
+        return audio
+
+
+class CompactAudioData(sr.AudioData):
+    """AudioData that encodes its FLAC request payload only once
+
+    Recognizers call ``get_flac_data`` for every request, so retries and
+    duplicate requests would otherwise pay for encoding again.
+    """
+
+    def __init__(self, frame_data, sample_rate, sample_width):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self._flac_cache = {}
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        key = (convert_rate, convert_width)
+        if key not in self._flac_cache:
+            self._flac_cache[key] = super().get_flac_data(convert_rate, convert_width)
+        return self._flac_cache[key]
+
+
+def compact_audio_data(audio, sample_rate=SPEECH_SAMPLE_RATE):
+    """Downsample captured audio to 16-bit at ``sample_rate`` once, up front"""
+    if audio.sample_rate <= sample_rate and audio.sample_width == 2:
+        return CompactAudioData(audio.frame_data, audio.sample_rate, 2)
+    return CompactAudioData(
+        audio.get_raw_data(
+            convert_rate=min(audio.sample_rate, sample_rate), convert_width=2
+        ),
+        min(audio.sample_rate, sample_rate),
+        2,
+    )
+
+
+def read_wav_chunks(audio_path, chunk_duration_ms=5000):
+    """Read a WAV file one window at a time, downmixed to mono 16-bit
+
+    Only the current window is held in memory, so peak usage does not grow
+    with the length of the recording.
+    """
+    with wave.open(audio_path, "rb") as f:
+        channels = f.getnchannels()
+        sample_width = f.getsampwidth()
+        sample_rate = f.getframerate()
+        frames_per_chunk = max(1, sample_rate * chunk_duration_ms // 1000)
+        index = 0
+        start_frame = 0
+        while True:
+            frames = f.readframes(frames_per_chunk)
+            if not frames:
+                break
+            if channels != 1 or sample_width != 2:
+                frames = (
+                    AudioSegment(
+                        data=frames,
+                        sample_width=sample_width,
+                        frame_rate=sample_rate,
+                        channels=channels,
+                    )
+                    .set_channels(1)
+                    .set_sample_width(2)
+                    .raw_data
+                )
+            end_frame = start_frame + len(frames) // 2
+            yield AudioChunk(
+                index,
+                start_frame * 1000 // sample_rate,
+                end_frame * 1000 // sample_rate,
+                memoryview(frames),
+                sample_rate,
+                2,
+            )
+            index += 1
+            start_frame = end_frame
+
+
+def stream_pcm(media_path, chunk_duration_ms=5000, sample_rate=SPEECH_SAMPLE_RATE):
+    """Decode a media file's audio track through an ffmpeg pipe
+
+    Chunks are yielded as soon as ffmpeg has produced enough samples, so
+    callers can start working long before the whole file is decoded.
+    """
+    sample_width = 2
+    frames_per_chunk = max(1, sample_rate * chunk_duration_ms // 1000)
+    bytes_per_chunk = frames_per_chunk * sample_width
+    command = [
+        FFMPEG_BINARY,
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        media_path,
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-",
+    ]
+    # A file rather than a pipe: nothing reads stderr until stdout is done,
+    # and a full pipe would stall ffmpeg on a badly damaged file
+    errors = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=errors, bufsize=0
+    )
+    try:
+        index = 0
+        start_frame = 0
+        while True:
+            data = _read_exactly(process.stdout, bytes_per_chunk)
+            if not data:
+                break
+            end_frame = start_frame + len(data) // sample_width
+            yield AudioChunk(
+                index,
+                start_frame * 1000 // sample_rate,
+                end_frame * 1000 // sample_rate,
+                memoryview(data),
+                sample_rate,
+                sample_width,
+            )
+            index += 1
+            start_frame = end_frame
+        if process.wait() != 0:
+            errors.seek(0)
+            error = errors.read().decode(errors="replace").strip()[-2000:]
+            if index == 0:
+                raise RuntimeError(f"ffmpeg could not decode {media_path}: {error}")
+            # Chunks already yielded are kept, but the transcript is incomplete
+            raise RuntimeError(
+                f"ffmpeg stopped decoding {media_path} after {index} chunks: {error}"
+            )
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        errors.close()
+
+
+def _read_exactly(stream, size):
+    buffer = bytearray()
+    while len(buffer) < size:
+        data = stream.read(size - len(buffer))
+        if not data:
+            break
+        buffer += data
+    return bytes(buffer)
+
+
+def write_wav(path, chunk):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(chunk.sample_width)
+        f.setframerate(chunk.sample_rate)
+        f.writeframes(chunk.data)
+
+
+def frame_levels(data, frame_length):
+    """Return the RMS level in dBFS of every complete frame of 16-bit PCM"""
+    samples = np.frombuffer(data, dtype=np.int16)
+    count = len(samples) // frame_length
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1.0) / 32768)
+
+
+def segment_on_pauses(
+    chunks,
+    min_segment_ms=2000,
+    max_segment_ms=15000,
+    min_silence_ms=300,
+    silence_thresh_db=-40,
+    frame_ms=30,
+):
+    """Regroup a stream of mono 16-bit chunks into segments cut on pauses
+
+    A segment ends in the middle of the first pause of at least
+    ``min_silence_ms`` once it is ``min_segment_ms`` long. If no pause shows
+    up before ``max_segment_ms`` it is cut at the quietest frame instead.
+    """
+    buffer = bytearray()
+    levels = np.empty(0)
+    start_frame = 0
+    index = 0
+    sample_rate = None
+    for chunk in chunks:
+        if sample_rate is None:
+            sample_rate = chunk.sample_rate
+            frame_length = max(1, sample_rate * frame_ms // 1000)
+            min_frames = min_segment_ms // frame_ms
+            max_frames = max(1, max_segment_ms // frame_ms)
+            silence_frames = max(1, min_silence_ms // frame_ms)
+        buffer += chunk.data
+        analysed = len(levels) * frame_length * 2
+        levels = np.concatenate((levels, frame_levels(buffer[analysed:], frame_length)))
+        while True:
+            cut = _find_cut(
+                levels, min_frames, max_frames, silence_frames, silence_thresh_db
+            )
+            if cut is None:
+                break
+            size = cut * frame_length * 2
+            yield _make_segment(index, start_frame, bytes(buffer[:size]), sample_rate)
+            del buffer[:size]
+            levels = levels[cut:]
+            start_frame += cut * frame_length
+            index += 1
+    if buffer:
+        yield _make_segment(index, start_frame, bytes(buffer), sample_rate)
+
+
+def _find_cut(levels, min_frames, max_frames, silence_frames, silence_thresh_db):
+    silent = levels[:max_frames] < silence_thresh_db
+    voiced = np.flatnonzero(~silent)
+    if len(voiced):
+        first_voiced = voiced[0]
+        if first_voiced >= max(silence_frames, min_frames):
+            # Leading silence becomes a segment of its own
+            return int(first_voiced - silence_frames // 2)
+        runs = np.convolve(
+            silent.astype(np.int32), np.ones(silence_frames, dtype=np.int32), "valid"
+        )
+        starts = np.flatnonzero(runs == silence_frames)
+        cuts = starts[starts > first_voiced] + silence_frames // 2
+        cuts = cuts[cuts >= max(1, min_frames)]
+        if len(cuts):
+            return int(cuts[0])
+    if len(levels) < max_frames:
+        return None
+    search_from = max(1, min_frames, max_frames // 2)
+    if search_from >= max_frames:
+        return max_frames
+    return search_from + int(np.argmin(levels[search_from:max_frames]))
+
+
+def _make_segment(index, start_frame, data, sample_rate):
+    end_frame = start_frame + len(data) // 2
+    return AudioChunk(
+        index,
+        start_frame * 1000 // sample_rate,
+        end_frame * 1000 // sample_rate,
+        memoryview(data),
+        sample_rate,
+        2,
+    )
@@ -0,0 +1,258 @@
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".speech_translator")
+
+
+class SqliteLRUCache:
+    """String cache stored in SQLite, with an in-memory LRU in front of it
+
+    The database holds at most ``max_entries`` rows; the least recently
+    used ones are evicted first. Safe to share between threads, and several
+    processes may open the same file.
+    """
+
+    def __init__(self, path, max_entries=100_000, memory_entries=2048):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            row = self._db.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE cache SET used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._remember(key, value)
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_entries:
+            old_key, _ = self._memory.popitem(last=False)
+            # Hits served from memory never touch the table, so record the
+            # use now to keep hot entries from being evicted on disk
+            self._db.execute(
+                "UPDATE cache SET used = ? WHERE key = ?", (time.time(), old_key)
+            )
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+
+def normalize_text(text):
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+class TranslationCache(SqliteLRUCache):
+    """Translations keyed on (normalized text, source, target)"""
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(path or os.path.join(CACHE_DIR, "translations.db"), **kwargs)
+
+    def translate(self, text, source, target, translate):
+        """Return a cached translation, calling ``translate(text)`` on a miss"""
+        cached = self.get_translation(text, source, target)
+        if cached is not None:
+            return cached
+        translated = translate(text)
+        if translated is not None:
+            self.put_translation(text, source, target, translated)
+        return translated
+
+    def get_translation(self, text, source, target):
+        return self.get(self._key(text, source, target))
+
+    def put_translation(self, text, source, target, translated):
+        self.put(self._key(text, source, target), translated)
+
+    @staticmethod
+    def _key(text, source, target):
+        return f"{source}\x1f{target}\x1f{normalize_text(text)}"
+
+
+class RecognitionCache(SqliteLRUCache):
+    """Recognition results keyed on a hash of the audio and its settings"""
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(path or os.path.join(CACHE_DIR, "recognitions.db"), **kwargs)
+
+    @staticmethod
+    def key(pcm, params):
+        digest = hashlib.sha256(params.encode())
+        digest.update(b"\0")
+        digest.update(pcm)
+        return digest.hexdigest()
+
+    def get_result(self, key):
+        value = self.get(key)
+        if value is None:
+            return None
+        text, confidence = json.loads(value)
+        return text, confidence
+
+    def put_result(self, key, text, confidence):
+        self.put(key, json.dumps([text, confidence]))
+
+
+class FileLRUCache:
+    """Files in one directory, evicting the least recently used past a size
+
+    Use is tracked through each file's modification time, which is
+    refreshed on every hit, so eviction needs no index of its own.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, suffix=""):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(size for _, _, size in self._entries())
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def partial_path(self, key):
+        """Where to write a new entry before ``put`` moves it into place"""
+        return os.path.join(
+            self.directory, f".{key}.{threading.get_ident()}{self.suffix}"
+        )
+
+    def get(self, key):
+        """Return the path of a cached file, or None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key, partial_path):
+        """Move a finished file into the cache and return its path"""
+        path = self.path(key)
+        os.replace(partial_path, path)
+        with self._lock:
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def stats(self):
+        entries = list(self._entries())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+        }
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        # Down to 90% so a full cache is not rescanned on every put
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+class SpeechCache(FileLRUCache):
+    """Synthesized speech keyed on (normalized text, voice, rate, volume)"""
+
+    def __init__(self, directory=None, **kwargs):
+        super().__init__(
+            directory or os.path.join(CACHE_DIR, "speech"), suffix=".wav", **kwargs
+        )
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        return hashlib.sha256(
+            f"{voice}\x1f{rate}\x1f{volume}\x1f{normalize_text(text)}".encode()
+        ).hexdigest()
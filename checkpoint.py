@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+
+RUN_INFO = "run.json"
+MANIFEST = "manifest.jsonl"
+
+
+def write_run_info(run_dir, info):
+    with open(os.path.join(run_dir, RUN_INFO), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+
+def read_run_info(run_dir):
+    with open(os.path.join(run_dir, RUN_INFO), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Manifest:
+    """Append-only record of the chunks a run has finished
+
+    One JSON object per line, flushed as each chunk completes, so a run
+    that crashes can be resumed without redoing finished chunks.
+    """
+
+    def __init__(self, run_dir):
+        self.path = os.path.join(run_dir, MANIFEST)
+        self._lock = threading.Lock()
+
+    def append(self, segment):
+        line = json.dumps(
+            {
+                "index": segment.index,
+                "start_ms": segment.start_ms,
+                "end_ms": segment.end_ms,
+                "text": segment.text,
+                "confidence": segment.confidence,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def load(self):
+        """Return ``{index: entry}`` for every complete line"""
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short by a crash
+                    continue
+                entries[entry["index"]] = entry
+        return entries
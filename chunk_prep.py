@@ -0,0 +1,42 @@
+# Imported by every audio pool worker, so it stays free of moviepy, pydub
+# and the translators
+import numpy as np
+import speech_recognition as sr
+
+from caches import RecognitionCache
+
+
+def is_silent(data, rms_threshold_db=-45, peak_threshold_db=-25):
+    """True if 16-bit PCM stays under both the RMS and the peak threshold"""
+    samples = np.frombuffer(data, dtype=np.int16)
+    if not len(samples):
+        return True
+    rms = np.sqrt(np.mean(samples.astype(np.float64) ** 2))
+    peak = np.max(np.abs(samples.astype(np.int32)))
+    rms_db = 20 * np.log10(max(rms, 1.0) / 32768)
+    peak_db = 20 * np.log10(max(peak, 1) / 32768)
+    return rms_db < rms_threshold_db and peak_db < peak_threshold_db
+
+
+def prepare_chunk(data, sample_rate, silence_threshold_db, cache_params, flac_params):
+    """CPU-bound work for one chunk, run in the audio process pool
+
+    Returns ``(silent, cache_key, flac)``: the silence gate's verdict, the
+    recognition cache key and the FLAC payload the backend will send.
+    """
+    if silence_threshold_db is not None and is_silent(
+        data, silence_threshold_db, silence_threshold_db + 20
+    ):
+        return True, None, None
+    cache_key = None
+    if cache_params is not None:
+        cache_key = RecognitionCache.key(data, cache_params)
+    flac = None
+    if flac_params:
+        try:
+            audio = sr.AudioData(bytes(data), sample_rate, 2)
+            flac = {flac_params: audio.get_flac_data(*flac_params)}
+        except Exception:
+            # Leave encoding (and reporting the error) to the recognizer
+            flac = None
+    return False, cache_key, flac
@@ -0,0 +1,311 @@
+import collections
+import concurrent.futures
+import random
+import threading
+import time
+
+
+class ReorderBuffer:
+    """Releases out-of-order results strictly by index
+
+    ``push`` may be called from any thread. ``deliver(index, item)`` is
+    called for every item of the contiguous prefix that is complete, in
+    index order, and never concurrently with itself.
+    """
+
+    def __init__(self, deliver, start=0):
+        self._deliver = deliver
+        self._next = start
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def push(self, index, item):
+        with self._lock:
+            self._waiting[index] = item
+            while self._next in self._waiting:
+                self._deliver(self._next, self._waiting.pop(self._next))
+                self._next += 1
+
+
+class ProgressTracker:
+    """Chunk counters for one job that can be updated from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+        self.skipped = 0
+        self.cached = 0
+        self.resumed = 0
+        self.closed = False
+
+    def add(self, skipped=False, cached=False, resumed=False):
+        """Count a newly extracted chunk"""
+        with self._lock:
+            self.total += 1
+            self.skipped += skipped
+            self.cached += cached
+            self.resumed += resumed
+
+    def finish(self):
+        """Count a chunk whose result has been recorded"""
+        with self._lock:
+            self.done += 1
+
+    def close(self):
+        """No more chunks will be added"""
+        with self._lock:
+            self.closed = True
+
+    def snapshot(self):
+        """Return ``(done, total, complete)`` read together"""
+        with self._lock:
+            return self.done, self.total, self.closed and self.done == self.total
+
+    @property
+    def complete(self):
+        return self.snapshot()[2]
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to the provider (AIMD)
+
+    Every successful call raises the limit by ``increase / limit``, i.e. by
+    about ``increase`` per round of calls, up to ``maximum``. A throttled or
+    failed call multiplies it by ``decrease``. Calls that were already in
+    flight when the limit dropped do not lower it again.
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=64, increase=1.0, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._changed = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def set_maximum(self, maximum, minimum=None):
+        """Change the bounds in place; calls in flight keep their slots"""
+        with self._changed:
+            self.maximum = maximum
+            if minimum is not None:
+                self.minimum = minimum
+            self._limit = float(max(self.minimum, min(self._limit, maximum)))
+            self._changed.notify_all()
+
+    def acquire(self):
+        """Wait for a free slot; pass the returned token to ``release``"""
+        with self._changed:
+            while self._in_flight >= int(self._limit):
+                self._changed.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    def try_acquire(self):
+        """Take a free slot without waiting; returns a token or None"""
+        with self._changed:
+            if self._in_flight >= int(self._limit):
+                return None
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self, token, throttled=False):
+        with self._changed:
+            self._in_flight -= 1
+            if throttled:
+                if token >= self._last_decrease:
+                    self._limit = max(self.minimum, self._limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+            else:
+                self._limit = min(
+                    self.maximum, self._limit + self.increase / self._limit
+                )
+            self._changed.notify_all()
+
+
+class TokenBucket:
+    """Allows ``rate`` calls per second on average, bursts of up to ``burst``"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """Take a token if one is available now"""
+        return not self._take()
+
+    def _take(self):
+        """Take a token, or return how long until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class Hedger:
+    """Re-issues calls that run past a latency percentile; the first answer wins
+
+    Latencies of recent calls set the hedge delay. Duplicate calls are
+    limited to ``budget`` (a fraction) of all calls, and none are sent
+    until ``min_samples`` latencies have been seen. A duplicate also needs
+    a free slot in ``limiter`` (an AdaptiveLimiter) and a token from
+    ``rate_limiter`` (a TokenBucket); without them the call is not hedged.
+    A duplicate that fails lowers the limit only if ``is_throttled(error)``
+    is true, so that answers such as "no speech" are not taken for overload;
+    by default every error counts.
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        budget=0.05,
+        max_workers=32,
+        min_samples=20,
+        window=500,
+        limiter=None,
+        rate_limiter=None,
+        is_throttled=None,
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+        self.is_throttled = is_throttled or (lambda error: True)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        # Calls inside call(), so shutdown can wait for the last one
+        self._active = 0
+        self._closing = False
+        # Losing calls cannot be cancelled, so leave room for them to finish
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers * 2
+        )
+
+    def delay(self):
+        """Seconds to wait before hedging, None while there is too little data"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[
+            min(len(latencies) - 1, len(latencies) * self.percentile // 100)
+        ]
+
+    def call(self, fn, *args):
+        with self._lock:
+            if self._closing:
+                # Replaced by a new hedger; this call just runs unhedged
+                closed = True
+            else:
+                closed = False
+                self.calls += 1
+                self._active += 1
+        if closed:
+            return fn(*args)
+        try:
+            return self._call(fn, *args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                last = self._closing and not self._active
+            if last:
+                self._executor.shutdown(wait=False)
+
+    def _call(self, fn, *args):
+        start = time.monotonic()
+        primary = self._executor.submit(fn, *args)
+        delay = self.delay()
+        try:
+            concurrent.futures.wait([primary], timeout=delay)
+            if primary.done() or not self._take_budget():
+                return primary.result()
+            admitted, token = self._admit()
+            if not admitted:
+                return primary.result()
+            hedge = self._executor.submit(fn, *args)
+            if self.limiter:
+                hedge.add_done_callback(lambda f: self._release(token, f))
+            pending = {primary, hedge}
+            while True:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                # An answer beats an error; an error only counts once both fail
+                for future in sorted(done, key=lambda f: f.exception() is not None):
+                    if future.exception() is None or not pending:
+                        if future is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return future.result()
+        finally:
+            with self._lock:
+                self._latencies.append(time.monotonic() - start)
+
+    def shutdown(self):
+        """Stop once the calls already inside ``call`` have finished"""
+        with self._lock:
+            self._closing = True
+            idle = not self._active
+        if idle:
+            self._executor.shutdown(wait=False)
+
+    def _admit(self):
+        """Take a hedge's share of the limits: ``(admitted, limiter token)``"""
+        if self.rate_limiter and not self.rate_limiter.try_acquire():
+            admitted, token = False, None
+        elif self.limiter:
+            token = self.limiter.try_acquire()
+            admitted = token is not None
+        else:
+            admitted, token = True, None
+        if not admitted:
+            # Not sent, so it does not count against the budget
+            with self._lock:
+                self.hedges -= 1
+        return admitted, token
+
+    def _release(self, token, future):
+        error = future.exception()
+        self.limiter.release(token, error is not None and self.is_throttled(error))
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedges >= self.budget * self.calls:
+                return False
+            self.hedges += 1
+            return True
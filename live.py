@@ -0,0 +1,499 @@
+import argparse
+import collections
+import concurrent.futures
+import statistics
+import sys
+import threading
+import time
+
+import speech_recognition as sr
+
+from audio_processing import (
+    SPEECH_SAMPLE_RATE,
+    CompactAudioData,
+    frame_levels,
+    stream_pcm,
+)
+from chunk_prep import is_silent
+from concurrency import ReorderBuffer, backoff_delay
+
+OVERLOAD_POLICIES = ("drop_oldest", "merge")
+
+
+class PhrasePipeline:
+    """Bounded worker pool for live phrases that delivers results in order
+
+    ``submit(phrase)`` queues a captured phrase. Up to ``workers`` phrases
+    are handled by ``process(phrase)`` at once, and each result is passed
+    to ``deliver(result)`` in capture order, from a worker thread. At most
+    ``max_queue`` phrases wait; when another arrives, the overload policy
+    either drops the oldest waiting phrase ("drop_oldest") or joins every
+    waiting phrase into one with ``merge(phrases)`` ("merge").
+    """
+
+    def __init__(
+        self,
+        process,
+        deliver,
+        workers=2,
+        max_queue=4,
+        policy="drop_oldest",
+        merge=None,
+    ):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        if policy == "merge" and merge is None:
+            raise ValueError("The merge policy needs a merge function")
+        self.process = process
+        self.max_queue = max_queue
+        self.policy = policy
+        self.merge = merge
+        self.dropped = 0
+        self.merged = 0
+        self._deliver = deliver
+        self._queue = collections.deque()
+        self._active = 0
+        self._sequence = 0
+        self._closed = False
+        self._changed = threading.Condition()
+        self._order = ReorderBuffer(lambda _, result: self._deliver(result))
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def waiting(self):
+        return len(self._queue)
+
+    @property
+    def active(self):
+        return self._active
+
+    def submit(self, phrase):
+        with self._changed:
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "merge":
+                    self.merged += len(self._queue)
+                    phrase = self.merge([*self._queue, phrase])
+                    self._queue.clear()
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append(phrase)
+            self._changed.notify()
+
+    def close(self, wait=False):
+        """Finish the queued phrases, then stop the workers"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _work(self):
+        while True:
+            with self._changed:
+                while not self._queue and not self._closed:
+                    self._changed.wait()
+                if not self._queue:
+                    return
+                phrase = self._queue.popleft()
+                # Numbered as they leave the queue, so dropped and merged
+                # phrases leave no gaps in the delivery order
+                sequence = self._sequence
+                self._sequence += 1
+                self._active += 1
+            try:
+                result = self.process(phrase)
+            except Exception as e:
+                result = e
+            with self._changed:
+                self._active -= 1
+            self._order.push(sequence, result)
+
+
+def merge_phrases(phrases):
+    """Join ``(audio, language)`` phrases captured back to back into one"""
+    audios = [audio for audio, _ in phrases]
+    first = audios[0]
+    return (
+        CompactAudioData(
+            b"".join(audio.frame_data for audio in audios),
+            first.sample_rate,
+            first.sample_width,
+        ),
+        phrases[-1][1],
+    )
+
+
+# Calls the old policy spent per phrase: "no speech" was retried three times
+NO_SPEECH_ATTEMPTS = 3
+
+
+class PhraseStats:
+    """Outcome and recognition latency of every live phrase
+
+    Outcomes are "recognized", "no_speech" (the recognizer heard nothing),
+    "silent" (skipped by the energy check without a call) and "failed"
+    (request errors on every attempt). ``calls_saved`` compares the calls
+    made with what retrying every "no speech" result would have cost.
+    """
+
+    def __init__(self):
+        self.outcomes = collections.Counter()
+        self.latencies = []
+        self.calls = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome, latency, calls, retries=0):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.latencies.append(latency)
+            self.calls += calls
+            self.retries += retries
+
+    @property
+    def phrases(self):
+        return sum(self.outcomes.values())
+
+    @property
+    def calls_saved(self):
+        empty = self.outcomes["silent"] + self.outcomes["no_speech"]
+        baseline = self.phrases - empty + empty * NO_SPEECH_ATTEMPTS
+        return baseline + self.retries - self.calls
+
+    def summary(self):
+        if not self.phrases:
+            return "no phrases"
+        counts = ", ".join(
+            f"{count} {outcome.replace('_', ' ')}"
+            for outcome, count in sorted(self.outcomes.items())
+        )
+        return (
+            f"{self.phrases} phrases ({counts}), {self.calls} calls, "
+            f"{self.retries} retries, {self.calls_saved} calls saved, "
+            f"median {statistics.median(self.latencies):.2f}s"
+        )
+
+
+def recognize_phrase(
+    backend,
+    audio,
+    language="en-US",
+    stats=None,
+    max_retries=3,
+    rms_threshold_db=-45,
+    peak_threshold_db=-25,
+):
+    """Recognize one live phrase, returning its text or None for no speech
+
+    Phrases that are too quiet to hold speech are skipped without a call.
+    "No speech" answers are final; request errors are transient and retried
+    with exponential backoff, then raised.
+    """
+    started = time.monotonic()
+    if is_silent(audio.frame_data, rms_threshold_db, peak_threshold_db):
+        if stats:
+            stats.record("silent", 0.0, 0)
+        return None
+    for attempt in range(max_retries + 1):
+        try:
+            text, _ = backend.recognize(audio, language)
+            outcome = "recognized"
+            break
+        except sr.UnknownValueError:
+            text = None
+            outcome = "no_speech"
+            break
+        except sr.RequestError:
+            if attempt == max_retries:
+                if stats:
+                    stats.record(
+                        "failed", time.monotonic() - started, attempt + 1, attempt
+                    )
+                raise
+        time.sleep(backoff_delay(attempt))
+    if stats:
+        stats.record(outcome, time.monotonic() - started, attempt + 1, attempt)
+    return text
+
+
+class MicrophoneSource:
+    """Microphone frames of 16-bit mono PCM, read continuously"""
+
+    def __init__(self, frame_ms=30, sample_rate=SPEECH_SAMPLE_RATE):
+        self.frame_ms = frame_ms
+        self.sample_rate = sample_rate
+        self._closed = False
+
+    def __iter__(self):
+        frame_samples = self.sample_rate * self.frame_ms // 1000
+        with sr.Microphone(
+            sample_rate=self.sample_rate, chunk_size=frame_samples
+        ) as source:
+            while not self._closed:
+                yield source.stream.read(frame_samples)
+
+    def close(self):
+        self._closed = True
+
+
+class WavReplaySource:
+    """Plays an audio file back in frames as if it were a microphone
+
+    With ``realtime`` each frame is released when it would have been
+    captured, so latencies measured against it match a live session.
+    """
+
+    def __init__(self, path, frame_ms=30, realtime=True):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.sample_rate = SPEECH_SAMPLE_RATE
+        self._closed = False
+
+    def __iter__(self):
+        start = time.monotonic()
+        for chunk in stream_pcm(self.path, self.frame_ms, self.sample_rate):
+            if self._closed:
+                break
+            if self.realtime:
+                delay = start + chunk.end_ms / 1000 - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            yield chunk.data.tobytes()
+
+    def close(self):
+        self._closed = True
+
+
+class StreamingTranscriber:
+    """Cuts a live PCM stream into utterances and shows partial results
+
+    Frames from ``source`` pass through a ring buffer holding the last
+    ``pre_roll_ms`` of audio. An energy VAD starts an utterance after
+    ``start_ms`` of speech (keeping the pre-roll) and ends it after
+    ``end_silence_ms`` of quiet or at ``max_utterance_ms``. Each finished
+    utterance goes to ``on_utterance(index, audio)``. While one is in
+    progress, the audio so far is recognized every ``partial_interval_ms``,
+    never more than one request at a time, and the hypothesis goes to
+    ``on_partial(index, text)``. Partials are never translated. If the
+    source fails (no microphone, unsupported rate), ``on_error(exception)``
+    is called and the transcriber stops; without it the error is raised.
+    """
+
+    def __init__(
+        self,
+        source,
+        backend,
+        language="en-US",
+        on_utterance=None,
+        on_partial=None,
+        on_error=None,
+        threshold_db=-40,
+        start_ms=90,
+        end_silence_ms=500,
+        max_utterance_ms=15000,
+        pre_roll_ms=300,
+        partial_interval_ms=500,
+    ):
+        self.source = source
+        self.backend = backend
+        self.language = language
+        self.on_utterance = on_utterance
+        self.on_partial = on_partial
+        self.on_error = on_error
+        self.threshold_db = threshold_db
+        frame_ms = source.frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = max_utterance_ms // frame_ms
+        self.partial_frames = (
+            partial_interval_ms // frame_ms if partial_interval_ms else None
+        )
+        # Monotonic time each utterance's speech began, by index
+        self.onsets = {}
+        self._ring = collections.deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._utterance = None
+        self._index = 0
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._frames_since_partial = 0
+        self._partial = None
+        self._partial_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._thread = None
+
+    @property
+    def utterances(self):
+        """Number of utterances finished so far"""
+        return self._index
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.source.close()
+
+    def run(self):
+        try:
+            for frame in self.source:
+                self.feed(frame)
+            if self._utterance is not None:
+                self._end_utterance()
+        except Exception as e:
+            if not self.on_error:
+                raise
+            self.on_error(e)
+        finally:
+            self._partial_executor.shutdown(wait=False)
+
+    def feed(self, frame):
+        if len(frame) < 2:
+            return
+        voiced = frame_levels(frame, len(frame) // 2)[0] >= self.threshold_db
+        if self._utterance is None:
+            self._ring.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.onsets[self._index] = time.monotonic() - (
+                    self.start_frames * self.source.frame_ms / 1000
+                )
+                self._utterance = bytearray(b"".join(self._ring))
+                self._frames = len(self._ring)
+                self._ring.clear()
+                self._silent_run = 0
+                self._frames_since_partial = 0
+            return
+        self._utterance += frame
+        self._frames += 1
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self.end_frames or self._frames >= self.max_frames:
+            self._end_utterance()
+            return
+        self._frames_since_partial += 1
+        if (
+            self.partial_frames
+            and self.on_partial
+            and self._frames_since_partial >= self.partial_frames
+            and (self._partial is None or self._partial.done())
+        ):
+            self._frames_since_partial = 0
+            self._partial = self._partial_executor.submit(
+                self._recognize_partial, self._index, bytes(self._utterance)
+            )
+
+    def _end_utterance(self):
+        audio = CompactAudioData(bytes(self._utterance), self.source.sample_rate, 2)
+        index = self._index
+        # Late partials for this utterance are ignored from now on
+        self._index += 1
+        self._utterance = None
+        self._voiced_run = 0
+        if self.on_utterance:
+            self.on_utterance(index, audio)
+
+    def _recognize_partial(self, index, data):
+        try:
+            text, _ = self.backend.recognize(
+                CompactAudioData(data, self.source.sample_rate, 2), self.language
+            )
+        except (sr.UnknownValueError, sr.RequestError):
+            return
+        if index == self._index:
+            self.on_partial(index, text)
+
+
+def main(argv=None):
+    from recognizers import BACKENDS, create_backend
+
+    parser = argparse.ArgumentParser(
+        description="Run streaming live transcription without the GUI."
+    )
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--replay", metavar="AUDIO", help="play back a file")
+    source_group.add_argument("--microphone", action="store_true")
+    parser.add_argument("--recognizer", choices=sorted(BACKENDS), default="google")
+    parser.add_argument("--language", default="en-US")
+    parser.add_argument(
+        "--translate", metavar="LANG_CODE", help="translate finals, e.g. ur"
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="replay as fast as possible instead of in real time",
+    )
+    parser.add_argument("--threshold-db", type=float, default=-40)
+    parser.add_argument("--partial-ms", type=int, default=500)
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="seconds per call for the stub recognizer",
+    )
+    args = parser.parse_args(argv)
+
+    options = {"latency": args.stub_latency} if args.recognizer == "stub" else {}
+    backend = create_backend(args.recognizer, **options)
+    if args.replay:
+        source = WavReplaySource(args.replay, realtime=not args.fast)
+    else:
+        source = MicrophoneSource()
+    start = time.monotonic()
+    first_text = {}
+
+    def show(index, kind, text):
+        now = time.monotonic()
+        first_text.setdefault(index, now - transcriber.onsets[index])
+        print(f"{now - start:7.2f}s #{index} {kind}: {text}")
+
+    stats = PhraseStats()
+
+    def finalize(phrase):
+        index, audio = phrase
+        text = recognize_phrase(backend, audio, args.language, stats)
+        if text is None:
+            return index, None
+        if args.translate:
+            from deep_translator import GoogleTranslator
+
+            text += " | " + GoogleTranslator(target=args.translate).translate(text)
+        return index, text
+
+    def deliver(result):
+        if isinstance(result, Exception):
+            print(f"Error: {result}", file=sys.stderr)
+        elif result[1]:
+            show(result[0], "final", result[1])
+
+    phrases = PhrasePipeline(finalize, deliver)
+    transcriber = StreamingTranscriber(
+        source,
+        backend,
+        args.language,
+        on_utterance=lambda index, audio: phrases.submit((index, audio)),
+        on_partial=lambda index, text: show(index, "partial", text),
+        threshold_db=args.threshold_db,
+        partial_interval_ms=args.partial_ms,
+    )
+    try:
+        transcriber.run()
+    except KeyboardInterrupt:
+        pass
+    phrases.close(wait=True)
+    if first_text:
+        print(
+            f"{len(transcriber.onsets)} utterances, median time to first text "
+            f"{statistics.median(first_text.values()):.2f}s"
+        )
+    print(stats.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,892 @@
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from moviepy import VideoFileClip
+import speech_recognition as sr
+
+from audio_processing import (
+    SPEECH_SAMPLE_RATE,
+    read_wav_chunks,
+    segment_on_pauses,
+    stream_pcm,
+    write_wav,
+)
+from caches import RecognitionCache, TranslationCache
+from checkpoint import Manifest, read_run_info, write_run_info
+from chunk_prep import prepare_chunk
+from concurrency import (
+    AdaptiveLimiter,
+    Hedger,
+    ProgressTracker,
+    ReorderBuffer,
+    TokenBucket,
+    backoff_delay,
+)
+from recognizers import BACKENDS, GoogleBackend, create_backend
+from transcript import EXPORT_FORMATS, Transcript, export_transcript
+from translation import language_code, translate_segment, translate_segments
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".flv")
+
+# Adaptive concurrency starts here and grows towards max_workers
+INITIAL_LIMIT = 8
+
+# A chunk takes about 6 ms to prepare (FLAC included), so a few processes
+# outpace any recognizer; each one costs tens of MB, since spawned workers
+# re-import the main module
+MAX_PREP_WORKERS = 4
+
+# Pipeline settings that decide chunk boundaries and results; saved with
+# each run so it can be resumed with the same chunks
+RUN_SETTINGS = (
+    "chunk_duration_ms",
+    "stream_audio",
+    "segmentation",
+    "min_segment_ms",
+    "max_segment_ms",
+    "silence_threshold_db",
+    "language",
+)
+
+
+def find_videos(paths):
+    """Expand a mix of files and directories into a list of video files"""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full_path = os.path.join(path, name)
+                if os.path.isfile(full_path) and name.lower().endswith(
+                    VIDEO_EXTENSIONS
+                ):
+                    videos.append(full_path)
+        else:
+            videos.append(path)
+    return videos
+
+
+def format_time(ms):
+    minutes, seconds = divmod(ms // 1000, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def is_failure(text):
+    """Request errors that should be retried rather than kept"""
+    return text.startswith(("[API error:", "[Error:"))
+
+
+class TranscriptionJob:
+    """State of a single video going through the pipeline"""
+
+    def __init__(
+        self, video_path, output_dir=None, on_result=None, on_translation=None
+    ):
+        self.video_path = video_path
+        # Set when the job starts running
+        self.output_dir = output_dir
+        self.on_result = on_result
+        self.on_translation = on_translation
+        # Chunks finish in any order; callbacks always see them in index order
+        self.result_order = ReorderBuffer(self._deliver_result)
+        self.translation_order = {}
+        self.progress = ProgressTracker()
+        self.transcript = Transcript()
+        self.error = None
+        self.started = False
+        # RUN_SETTINGS for this job, fixed when it starts (or read from the
+        # run being resumed) so later settings changes cannot move its chunks
+        self.settings = None
+        # Recognizer named in the run being resumed
+        self.recognizer = None
+        # Results already in the run's manifest when resuming: {index: entry}
+        self.completed = {}
+        self.manifest = None
+        # Recognition chunks of this job submitted to the pool and not finished
+        self.pending = 0
+        self._cancelled = threading.Event()
+        self.futures = []
+        self.translation_futures = []
+
+    @property
+    def chunk_total(self):
+        return self.progress.total
+
+    @property
+    def chunk_done(self):
+        return self.progress.done
+
+    @property
+    def skipped(self):
+        return self.progress.skipped
+
+    @property
+    def cached(self):
+        return self.progress.cached
+
+    @property
+    def resumed(self):
+        return self.progress.resumed
+
+    @property
+    def complete(self):
+        return self.progress.complete
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def state(self):
+        if self.cancelled:
+            return "cancelled"
+        if self.error:
+            return "failed"
+        if not self.started:
+            return "queued"
+        if self.complete:
+            return "done"
+        return "running"
+
+    def cancel(self):
+        """Stop extracting and drop every chunk that has not started yet"""
+        self._cancelled.set()
+        for future in list(self.futures) + list(self.translation_futures):
+            future.cancel()
+
+    def add_target(self, target_lang):
+        self.transcript.add_language(target_lang)
+        self.translation_order[target_lang] = ReorderBuffer(
+            lambda index, text: self._deliver_translation(index, target_lang, text)
+        )
+
+    def _deliver_result(self, index, text):
+        if self.on_result:
+            self.on_result(self, index, text)
+
+    def _deliver_translation(self, index, target_lang, text):
+        if self.on_translation:
+            self.on_translation(self, index, target_lang, text)
+
+    def wait(self):
+        concurrent.futures.wait(self.futures)
+        # Every translation is queued before its recognition future finishes
+        concurrent.futures.wait(self.translation_futures)
+
+
+class TranscriptionPipeline:
+    """Extracts, chunks and recognizes videos on one shared worker pool"""
+
+    def __init__(
+        self,
+        max_workers=32,
+        chunk_duration_ms=5000,
+        base_output_dir="Video Chunks Outputs",
+        keep_chunk_files=False,
+        stream_audio=True,
+        segmentation="fixed",
+        min_segment_ms=2000,
+        max_segment_ms=15000,
+        silence_threshold_db=-45,
+        backend=None,
+        language="en-US",
+        recognition_cache=None,
+        translate_to=(),
+        translation_cache=None,
+        adaptive=True,
+        rate_limit=None,
+        max_retries=3,
+        hedge_percentile=None,
+        hedge_budget=0.05,
+        prep_workers=None,
+    ):
+        self.backend = backend or GoogleBackend()
+        self.language = language
+        self.recognition_cache = recognition_cache
+        # Languages to translate each chunk into as soon as it is recognized
+        self.translate_to = list(translate_to)
+        self.translation_cache = translation_cache
+        self.translation_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.chunk_duration_ms = chunk_duration_ms
+        self.base_output_dir = base_output_dir
+        # Chunk WAVs are only written for debugging; workers read from memory
+        self.keep_chunk_files = keep_chunk_files
+        # Decode through an ffmpeg pipe instead of writing a temp WAV first
+        self.stream_audio = stream_audio
+        # "fixed" cuts every chunk_duration_ms, "pauses" cuts on silence
+        self.segmentation = segmentation
+        self.min_segment_ms = min_segment_ms
+        self.max_segment_ms = max_segment_ms
+        # Chunks quieter than this (RMS dBFS, peak 20 dB above) are never sent
+        # to the recognizer; None disables the gate
+        self.silence_threshold_db = silence_threshold_db
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        # Silence gate, cache keys and FLAC encoding run on a process pool
+        # (0 to run them on the extraction thread); at most prep_queue_depth
+        # prepared chunks wait for the I/O pool
+        if prep_workers is None:
+            prep_workers = min(MAX_PREP_WORKERS, os.cpu_count() or 1)
+        self.prep_workers = prep_workers
+        self.prep_queue_depth = max(2, self.prep_workers * 2)
+        self._prep_executor = None
+        # Recognizer calls in flight adapt between 1 and max_workers (AIMD);
+        # with adaptive=False the limit stays at max_workers
+        self.adaptive = adaptive
+        self.limiter = self.make_limiter(max_workers)
+        # Recognizer requests per second, None for no limit
+        self.rate_limit = rate_limit
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        # Request errors are retried with jittered exponential backoff
+        self.max_retries = max_retries
+        self.retries = 0
+        # Calls slower than this latency percentile get a duplicate request,
+        # for at most hedge_budget of all calls; None disables hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.hedger = self.make_hedger(max_workers)
+        self._lock = threading.Lock()
+        # Cap on submitted-but-unfinished chunks, so decoded audio waiting in
+        # the executor queue cannot grow with the length of the input
+        self.max_pending = max_workers * 4
+        self._pending = 0
+        self._pending_changed = threading.Condition(self._lock)
+        self._extracting_jobs = 0
+
+    def make_limiter(self, max_workers):
+        if self.adaptive:
+            return AdaptiveLimiter(min(INITIAL_LIMIT, max_workers), 1, max_workers)
+        return AdaptiveLimiter(max_workers, max_workers, max_workers)
+
+    def make_hedger(self, max_workers):
+        if self.hedge_percentile is None:
+            return None
+        return Hedger(
+            self.hedge_percentile,
+            self.hedge_budget,
+            max_workers,
+            limiter=self.limiter,
+            rate_limiter=self.rate_limiter,
+            is_throttled=lambda error: isinstance(error, sr.RequestError),
+        )
+
+    def resize(self, max_workers):
+        """Apply a new max_workers and the current limit and hedge settings"""
+        old_executor = self.executor
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        old_executor.shutdown(wait=False)
+        # The same limiter, so calls already in flight still count against it
+        self.limiter.set_maximum(max_workers, 1 if self.adaptive else max_workers)
+        self.rate_limiter = TokenBucket(self.rate_limit) if self.rate_limit else None
+        if self.hedger:
+            self.hedger.shutdown()
+        self.hedger = self.make_hedger(max_workers)
+        with self._lock:
+            self.max_pending = max_workers * 4
+            self._pending_changed.notify_all()
+
+    @property
+    def prep_executor(self):
+        # Started on first use, under the lock since jobs extract concurrently;
+        # "spawn" because the GUI forks with threads running
+        with self._lock:
+            if self._prep_executor is None:
+                self._prep_executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.prep_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._prep_executor
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.translation_executor.shutdown(wait=True)
+        if self._prep_executor:
+            self._prep_executor.shutdown(wait=True)
+        if self.hedger:
+            self.hedger.shutdown()
+
+    def make_output_dir(self, video_path):
+        os.makedirs(self.base_output_dir, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        output_dir = os.path.join(self.base_output_dir, f"Run_{timestamp}_{name}")
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    def extract_audio(self, video_path, output_dir):
+        audio_path = os.path.join(output_dir, "temp_audio.wav")
+        with VideoFileClip(video_path) as video:
+            video.audio.write_audiofile(
+                audio_path,
+                fps=SPEECH_SAMPLE_RATE,
+                codec="pcm_s16le",
+                ffmpeg_params=["-ac", "1"],
+                logger=None,
+            )
+        return audio_path
+
+    def chunk_audio(self, audio_path, output_dir, chunk_duration_ms=5000):
+        return read_wav_chunks(audio_path, chunk_duration_ms)
+
+    def run_settings(self):
+        return {name: getattr(self, name) for name in RUN_SETTINGS}
+
+    def iter_chunks(self, video_path, output_dir, settings=None):
+        settings = settings or self.run_settings()
+        if settings["segmentation"] == "pauses":
+            # Read in short windows and let the segmenter decide where to cut
+            window_ms = 1000
+        else:
+            window_ms = settings["chunk_duration_ms"]
+        if settings["stream_audio"]:
+            chunks = stream_pcm(video_path, window_ms)
+        else:
+            audio_path = self.extract_audio(video_path, output_dir)
+            chunks = self.chunk_audio(audio_path, output_dir, window_ms)
+        if settings["segmentation"] == "pauses":
+            chunks = segment_on_pauses(
+                chunks,
+                min_segment_ms=settings["min_segment_ms"],
+                max_segment_ms=settings["max_segment_ms"],
+            )
+        return chunks
+
+    def recognize_audio(self, chunk, cache_key=None, language=None):
+        """Return ``(text, confidence)``; failures become bracketed text
+
+        Answers from the recognizer, including "no speech", are stored under
+        ``cache_key``. Request failures are not cached.
+        """
+        try:
+            text, confidence = self.call_backend(
+                chunk.to_audio_data(), language or self.language
+            )
+        except sr.UnknownValueError:
+            text, confidence = "[Unintelligible audio]", None
+        except sr.RequestError as e:
+            return f"[API error: {e}]", None
+        except Exception as e:
+            return f"[Error: {e}]", None
+        if cache_key and self.recognition_cache:
+            self.recognition_cache.put_result(cache_key, text, confidence)
+        return text, confidence
+
+    def call_backend(self, audio, language):
+        """Recognize under the rate and concurrency limits, retrying request errors"""
+        limiter = self.limiter
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            token = limiter.acquire()
+            throttled = False
+            try:
+                if self.hedger:
+                    return self.hedger.call(self.backend.recognize, audio, language)
+                return self.backend.recognize(audio, language)
+            except sr.RequestError:
+                throttled = True
+                if attempt == self.max_retries:
+                    raise
+            finally:
+                limiter.release(token, throttled)
+            with self._lock:
+                self.retries += 1
+            time.sleep(backoff_delay(attempt))
+
+    def cache_params(self, settings):
+        """Everything besides the audio itself that affects recognition"""
+        return "|".join(
+            str(value)
+            for value in (
+                self.backend.name,
+                getattr(self.backend, "model_path", ""),
+                settings["language"],
+                settings["segmentation"],
+                settings["chunk_duration_ms"],
+                settings["min_segment_ms"],
+                settings["max_segment_ms"],
+            )
+        )
+
+    def start_job(self, video_path, on_result=None, on_translation=None):
+        """Extract and chunk a video, queueing chunks on the shared pool
+
+        Chunks are submitted while the audio is still being decoded. The call
+        returns once extraction has finished; ``on_result(job, index, text)``
+        is called from a worker thread for each chunk, and
+        ``on_translation(job, index, target_lang, text)`` for each of its
+        pipelined translations, always in chunk order.
+        """
+        return self.run_job(
+            TranscriptionJob(video_path, None, on_result, on_translation)
+        )
+
+    def open_run(self, run_dir, on_result=None, on_translation=None):
+        """Prepare a job that resumes an interrupted run in ``run_dir``
+
+        The job keeps the run's saved settings so chunks come out the same;
+        only chunks missing from its manifest are recognized. The run must
+        use the pipeline's recognizer.
+        """
+        info = read_run_info(run_dir)
+        self.check_recognizer(info)
+        job = TranscriptionJob(info["video_path"], run_dir, on_result, on_translation)
+        job.settings = {**self.run_settings(), **info["settings"]}
+        job.recognizer = info.get("recognizer")
+        job.completed = Manifest(run_dir).load()
+        return job
+
+    def check_recognizer(self, info):
+        recognizer = info.get("recognizer")
+        if recognizer and recognizer != self.backend.name:
+            raise ValueError(
+                f"This run used the {recognizer} recognizer, "
+                f"not {self.backend.name}; switch recognizers to resume it"
+            )
+
+    def run_job(self, job):
+        """Run a job created ahead of time, e.g. by a JobScheduler or open_run"""
+        job.started = True
+        if job.recognizer:
+            # The recognizer may have been switched since the run was queued
+            self.check_recognizer({"recognizer": job.recognizer})
+        if job.settings is None:
+            job.settings = self.run_settings()
+        if job.output_dir is None:
+            job.output_dir = self.make_output_dir(job.video_path)
+            write_run_info(
+                job.output_dir,
+                {
+                    "video_path": os.path.abspath(job.video_path),
+                    "recognizer": self.backend.name,
+                    "settings": job.settings,
+                },
+            )
+        job.manifest = Manifest(job.output_dir)
+        targets = [(lang, language_code(lang)) for lang in self.translate_to]
+        for target_lang, _ in targets:
+            job.add_target(target_lang)
+        cache_params = self.cache_params(job.settings)
+        chunks = self.iter_chunks(job.video_path, job.output_dir, job.settings)
+        with self._lock:
+            self._extracting_jobs += 1
+        prepared = collections.deque()
+        try:
+            for chunk in chunks:
+                if job.cancelled:
+                    break
+                entry = job.completed.get(chunk.index)
+                if entry:
+                    job.transcript.add_segment(
+                        chunk.index, chunk.start_ms, chunk.end_ms
+                    )
+                    job.progress.add(resumed=True)
+                    self._record_result(
+                        job,
+                        chunk.index,
+                        entry["text"],
+                        entry["confidence"],
+                        targets,
+                        checkpoint=False,
+                    )
+                    continue
+                if self.keep_chunk_files:
+                    write_wav(
+                        os.path.join(
+                            job.output_dir, f"chunk_{chunk.start_ms // 1000}.wav"
+                        ),
+                        chunk,
+                    )
+                prepared.append(
+                    (chunk, self.prepare(chunk, cache_params, job.settings))
+                )
+                if len(prepared) >= self.prep_queue_depth:
+                    self._dispatch(job, *prepared.popleft(), targets)
+            while prepared and not job.cancelled:
+                self._dispatch(job, *prepared.popleft(), targets)
+        finally:
+            for _, future in prepared:
+                future.cancel()
+            chunks.close()
+            with self._lock:
+                self._extracting_jobs -= 1
+                self._pending_changed.notify_all()
+            job.progress.close()
+        return job
+
+    def prepare(self, chunk, cache_params, settings):
+        """Start the CPU-bound work for a chunk; returns a future"""
+        args = (
+            chunk.data,
+            chunk.sample_rate,
+            settings["silence_threshold_db"],
+            cache_params if self.recognition_cache else None,
+            self.backend.flac_params,
+        )
+        if not self.prep_workers:
+            future = concurrent.futures.Future()
+            future.set_result(prepare_chunk(*args))
+            return future
+        # Memoryviews cannot be pickled
+        return self.prep_executor.submit(prepare_chunk, bytes(chunk.data), *args[1:])
+
+    def _dispatch(self, job, chunk, prepared, targets):
+        """Record a prepared chunk, or queue it for recognition on the I/O pool"""
+        silent, cache_key, chunk.flac = prepared.result()
+        if silent:
+            job.transcript.add_segment(chunk.index, chunk.start_ms, chunk.end_ms)
+            job.progress.add(skipped=True)
+            self._record_result(job, chunk.index, "[Silence]", None, targets)
+            return
+        if cache_key:
+            cached = self.recognition_cache.get_result(cache_key)
+            if cached:
+                job.transcript.add_segment(chunk.index, chunk.start_ms, chunk.end_ms)
+                job.progress.add(cached=True)
+                self._record_result(job, chunk.index, *cached, targets)
+                return
+        with self._lock:
+            # Jobs extracting at the same time split the pending slots
+            # evenly, so one long video cannot starve the rest
+            while not job.cancelled and (
+                self._pending >= self.max_pending
+                or job.pending >= max(1, self.max_pending // self._extracting_jobs)
+            ):
+                self._pending_changed.wait()
+            if job.cancelled:
+                return
+            self._pending += 1
+            job.pending += 1
+        job.transcript.add_segment(chunk.index, chunk.start_ms, chunk.end_ms)
+        job.progress.add()
+        future = self.executor.submit(self._run_chunk, job, chunk, cache_key, targets)
+        future.add_done_callback(lambda _, job=job: self._chunk_finished(job))
+        job.futures.append(future)
+
+    def cancel(self, job):
+        job.cancel()
+        with self._lock:
+            self._pending_changed.notify_all()
+
+    def _chunk_finished(self, job):
+        # Also runs for cancelled chunks, which never reach _run_chunk
+        with self._lock:
+            self._pending -= 1
+            job.pending -= 1
+            self._pending_changed.notify_all()
+
+    def _run_chunk(self, job, chunk, cache_key, targets):
+        if job.cancelled:
+            return None
+        text, confidence = self.recognize_audio(
+            chunk, cache_key, job.settings["language"]
+        )
+        self._record_result(job, chunk.index, text, confidence, targets)
+        return text
+
+    def _record_result(self, job, index, text, confidence, targets, checkpoint=True):
+        with self._lock:
+            segment = job.transcript[index]
+            segment.text = text
+            segment.confidence = confidence
+        if checkpoint and job.manifest and not is_failure(text):
+            job.manifest.append(segment)
+        job.progress.finish()
+        for target_lang, lang_code in targets:
+            job.translation_futures.append(
+                self.translation_executor.submit(
+                    self._translate_chunk, job, index, text, target_lang, lang_code
+                )
+            )
+        job.result_order.push(index, text)
+
+    def _translate_chunk(self, job, index, text, target_lang, lang_code):
+        try:
+            translated = translate_segment(text, lang_code, self.translation_cache)
+        except Exception as e:
+            translated = f"[Translation failed: {e}]"
+        with self._lock:
+            job.transcript[index].translations[target_lang] = translated
+        job.translation_order[target_lang].push(index, translated)
+
+    def transcribe(self, video_path, on_result=None, on_translation=None):
+        job = self.start_job(video_path, on_result, on_translation)
+        job.wait()
+        return job
+
+    def transcribe_batch(self, video_paths, on_result=None, on_job_done=None):
+        """Transcribe many videos, overlapping extraction with recognition
+
+        Every file's chunks go onto the same pool, so the next video is being
+        extracted while the previous one is still being recognized.
+        """
+        jobs = []
+        for video_path in video_paths:
+            job = TranscriptionJob(video_path, None, on_result)
+            try:
+                self.run_job(job)
+            except Exception as e:
+                # Chunks already queued still finish, so a partial transcript
+                # can be written and the run resumed
+                job.error = e
+            jobs.append(job)
+        for job in jobs:
+            job.wait()
+            if on_job_done:
+                on_job_done(job)
+        return jobs
+
+
+def write_transcript(job, target_langs=(), cache=None, formats=("txt",)):
+    """Write the transcript (and any translations) next to the source video"""
+    transcript = job.transcript
+    segments = transcript.texts()
+    for target_lang in target_langs:
+        if target_lang not in transcript.languages:
+            transcript.set_translations(
+                target_lang, translate_segments(segments, target_lang, cache)
+            )
+    return export_transcript(
+        transcript, os.path.splitext(job.video_path)[0], formats, target_langs
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Transcribe video files without the GUI."
+    )
+    parser.add_argument("paths", nargs="*", help="video files or directories")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_DIR",
+        help="finish an interrupted run, recognizing only the chunks missing "
+        "from its manifest",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=32,
+        help="most recognizer calls in flight (default: 32)",
+    )
+    parser.add_argument(
+        "--fixed-concurrency",
+        action="store_true",
+        help="always use --workers calls instead of adapting to the provider",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="most recognizer requests per second (default: no limit)",
+    )
+    parser.add_argument(
+        "--prep-workers",
+        type=int,
+        help="processes for silence gating and FLAC encoding "
+        f"(default: up to {MAX_PREP_WORKERS}, 0 to use the extraction thread)",
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=int,
+        help="send a duplicate request for calls slower than this latency "
+        "percentile, e.g. 95 (default: off)",
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=0.05,
+        help="most duplicate requests as a fraction of all calls (default: 0.05)",
+    )
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        nargs=3,
+        metavar=("SECONDS", "TAIL_SECONDS", "TAIL_RATE"),
+        help="make the stub recognizer sleep, with a fraction of slow calls",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="retries for failed recognizer requests (default: 3)",
+    )
+    parser.add_argument("--chunk-ms", type=int, default=5000)
+    parser.add_argument("--output-root", default="Video Chunks Outputs")
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="translate each chunk as soon as it is recognized",
+    )
+    parser.add_argument(
+        "--no-translation-cache",
+        action="store_true",
+        help="always call the translation service",
+    )
+    parser.add_argument(
+        "--no-recognition-cache",
+        action="store_true",
+        help="recognize every chunk even if identical audio was seen before",
+    )
+    parser.add_argument(
+        "--recognizer",
+        choices=sorted(BACKENDS),
+        default="google",
+        help="speech recognition backend (vosk runs offline)",
+    )
+    parser.add_argument(
+        "--vosk-model", default="model", help="path to a Vosk model directory"
+    )
+    parser.add_argument("--language", default="en-US", help="spoken language tag")
+    parser.add_argument(
+        "--segmentation",
+        choices=["fixed", "pauses"],
+        default="fixed",
+        help="cut every --chunk-ms, or on pauses in speech",
+    )
+    parser.add_argument("--min-segment-ms", type=int, default=2000)
+    parser.add_argument("--max-segment-ms", type=int, default=15000)
+    parser.add_argument(
+        "--silence-threshold-db",
+        type=float,
+        default=-45,
+        help="skip chunks quieter than this RMS level in dBFS",
+    )
+    parser.add_argument(
+        "--no-silence-gate",
+        action="store_true",
+        help="send every chunk to the recognizer",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="extract a temporary WAV file before chunking",
+    )
+    parser.add_argument(
+        "--keep-chunks",
+        action="store_true",
+        help="also write every chunk as a WAV file (for debugging)",
+    )
+    parser.add_argument(
+        "-t",
+        "--translate",
+        action="append",
+        default=[],
+        metavar="LANGUAGE",
+        help="also write a translation, e.g. Spanish (repeatable)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        action="append",
+        choices=EXPORT_FORMATS,
+        help="transcript formats to write (repeatable, default: txt)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        if args.paths:
+            parser.error("--resume does not take video paths")
+        videos = [args.resume]
+    else:
+        videos = find_videos(args.paths)
+        if not videos:
+            parser.error("no video files found")
+
+    options = {}
+    if args.recognizer == "vosk":
+        options["model_path"] = args.vosk_model
+    elif args.recognizer == "stub" and args.stub_latency:
+        latency, tail_latency, tail_rate = args.stub_latency
+        options = {
+            "latency": latency,
+            "tail_latency": tail_latency,
+            "tail_rate": tail_rate,
+        }
+    translation_cache = None if args.no_translation_cache else TranslationCache()
+    pipeline = TranscriptionPipeline(
+        backend=create_backend(args.recognizer, **options),
+        language=args.language,
+        recognition_cache=None if args.no_recognition_cache else RecognitionCache(),
+        max_workers=args.workers,
+        chunk_duration_ms=args.chunk_ms,
+        base_output_dir=args.output_root,
+        keep_chunk_files=args.keep_chunks,
+        stream_audio=not args.no_stream,
+        segmentation=args.segmentation,
+        min_segment_ms=args.min_segment_ms,
+        max_segment_ms=args.max_segment_ms,
+        silence_threshold_db=(
+            None if args.no_silence_gate else args.silence_threshold_db
+        ),
+        translate_to=args.translate if args.pipelined else (),
+        translation_cache=translation_cache,
+        adaptive=not args.fixed_concurrency,
+        rate_limit=args.rate_limit,
+        max_retries=args.retries,
+        hedge_percentile=args.hedge_percentile,
+        hedge_budget=args.hedge_budget,
+        prep_workers=args.prep_workers,
+    )
+
+    def on_job_done(job):
+        if job.error:
+            print(f"Error: {job.video_path}: {job.error}", file=sys.stderr)
+            if not job.chunk_done:
+                return
+            print(
+                f"{job.video_path}: writing the {job.chunk_done} chunks finished; "
+                f'resume with --resume "{job.output_dir}"',
+                file=sys.stderr,
+            )
+        print(
+            f"{job.video_path}: {job.chunk_total} chunks, {job.skipped} silent, "
+            f"{job.cached} from the recognition cache, {job.resumed} resumed"
+        )
+        try:
+            for path in write_transcript(
+                job, args.translate, translation_cache, args.format or ("txt",)
+            ):
+                print(f"Wrote {path}")
+        except Exception as e:
+            print(f"Error: {job.video_path}: {e}", file=sys.stderr)
+
+    try:
+        if args.resume:
+            try:
+                job = pipeline.open_run(args.resume)
+            except (OSError, ValueError) as e:
+                print(f"Error: cannot resume {args.resume}: {e}", file=sys.stderr)
+                return 1
+            try:
+                pipeline.run_job(job)
+            except Exception as e:
+                job.error = e
+            job.wait()
+            on_job_done(job)
+            jobs = [job]
+        else:
+            jobs = pipeline.transcribe_batch(videos, on_job_done=on_job_done)
+        print(
+            f"Concurrency limit {pipeline.limiter.limit}/{args.workers}, "
+            f"{pipeline.retries} retried requests"
+        )
+        if pipeline.hedger:
+            print(
+                f"Hedged {pipeline.hedger.hedges} of {pipeline.hedger.calls} calls, "
+                f"{pipeline.hedger.hedge_wins} answered first by the duplicate"
+            )
+    finally:
+        pipeline.shutdown()
+    return 1 if any(job.error for job in jobs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
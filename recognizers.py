@@ -0,0 +1,123 @@
+import hashlib
+import json
+import random
+import time
+
+import speech_recognition as sr
+
+
+class RecognizerBackend:
+    """Speech recognition engine used by both apps
+
+    ``recognize`` returns ``(text, confidence)`` and raises the same
+    ``sr.UnknownValueError`` / ``sr.RequestError`` exceptions as the
+    speech_recognition library, so callers can treat every backend alike.
+    """
+
+    name = None
+    # The get_flac_data arguments the backend uses, so the payload can be
+    # encoded ahead of time; None if it does not send FLAC
+    flac_params = None
+
+    def recognize(self, audio, language="en-US"):
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+    # 16-bit, and no resampling for audio at 8 kHz or more
+    flac_params = (None, 2)
+
+    def __init__(self, key=None):
+        self.key = key
+
+    def recognize(self, audio, language="en-US"):
+        result = sr.Recognizer().recognize_google(
+            audio, key=self.key, language=language, show_all=True
+        )
+        if not isinstance(result, dict) or not result.get("alternative"):
+            raise sr.UnknownValueError()
+        best = result["alternative"][0]
+        if "transcript" not in best:
+            raise sr.UnknownValueError()
+        return best["transcript"], best.get("confidence")
+
+
+class StubBackend(RecognizerBackend):
+    """Deterministic offline recognizer for tests and benchmarks
+
+    The "transcript" is derived from a hash of the audio, so the same clip
+    always gives the same answer. ``latency`` seconds are spent per call to
+    imitate a remote service, and a ``tail_rate`` fraction of calls take
+    ``tail_latency`` seconds instead, like stragglers from a real provider.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.0, tail_latency=0.0, tail_rate=0.0):
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_rate = tail_rate
+
+    def recognize(self, audio, language="en-US"):
+        data = audio.get_raw_data()
+        if self.tail_rate and random.random() < self.tail_rate:
+            time.sleep(self.tail_latency)
+        elif self.latency:
+            time.sleep(self.latency)
+        if not data.strip(b"\0"):
+            raise sr.UnknownValueError()
+        digest = hashlib.sha1(data).hexdigest()
+        return f"stub {language} {digest[:8]}", 1.0
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline CPU recognizer using a local Vosk model
+
+    The language is fixed by the model, so the ``language`` argument is
+    ignored. The model is loaded once and shared by all worker threads;
+    Vosk decodes outside the GIL, so chunks run in parallel on every core.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path="model"):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("The vosk recognizer needs 'pip install vosk'")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model_path = model_path
+        self.model = vosk.Model(model_path)
+
+    def recognize(self, audio, language="en-US"):
+        recognizer = self._vosk.KaldiRecognizer(self.model, 16000)
+        recognizer.SetWords(True)
+        return self._decode(recognizer, audio)
+
+    def _decode(self, recognizer, audio):
+        recognizer.AcceptWaveform(
+            audio.get_raw_data(convert_rate=16000, convert_width=2)
+        )
+        result = json.loads(recognizer.FinalResult())
+        if not result.get("text"):
+            raise sr.UnknownValueError()
+        words = result.get("result", [])
+        confidence = sum(w["conf"] for w in words) / len(words) if words else None
+        return result["text"], confidence
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "stub": StubBackend,
+}
+
+
+def create_backend(name, **options):
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown recognizer {name!r}")
+    return backend_class(**options)
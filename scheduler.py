@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import threading
+
+from pipeline import TranscriptionJob
+
+
+class JobScheduler:
+    """Queue of videos transcribed on one shared pipeline
+
+    Jobs start in priority order (lower first, first-in first-out within a
+    priority). Up to ``max_active`` run at once, so the next video is
+    extracted while the previous one is still being recognized; the
+    pipeline splits its worker pool fairly between them.
+    ``on_job_done(job)`` is called from a scheduler thread when a job
+    finishes, fails or is cancelled.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        max_active=2,
+        on_result=None,
+        on_translation=None,
+        on_job_done=None,
+    ):
+        self.pipeline = pipeline
+        self.on_result = on_result
+        self.on_translation = on_translation
+        self.on_job_done = on_job_done
+        # Every job submitted, in submission order
+        self.jobs = []
+        self._queue = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._closed = False
+        self._changed = threading.Condition()
+        self._runners = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(max_active)
+        ]
+        for runner in self._runners:
+            runner.start()
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    @property
+    def running(self):
+        return self._running
+
+    def submit(self, video_path, priority=0):
+        return self.submit_job(
+            TranscriptionJob(video_path, None, self.on_result, self.on_translation),
+            priority,
+        )
+
+    def resume(self, run_dir, priority=0):
+        """Queue an interrupted run; see TranscriptionPipeline.open_run"""
+        return self.submit_job(
+            self.pipeline.open_run(run_dir, self.on_result, self.on_translation),
+            priority,
+        )
+
+    def submit_job(self, job, priority=0):
+        with self._changed:
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self.jobs.append(job)
+            self._changed.notify_all()
+        return job
+
+    def cancel(self, job):
+        """Cancel a queued or running job"""
+        self.pipeline.cancel(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            if job.state in ("queued", "running"):
+                self.cancel(job)
+
+    def wait(self):
+        """Block until every submitted job has finished"""
+        with self._changed:
+            while self._queue or self._running:
+                self._changed.wait()
+
+    def close(self):
+        """Stop the scheduler threads once the queue is empty"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        for runner in self._runners:
+            runner.join()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                while not self._queue and not self._closed:
+                    self._changed.wait()
+                if not self._queue:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                self._running += 1
+            try:
+                if not job.cancelled:
+                    try:
+                        self.pipeline.run_job(job)
+                    finally:
+                        # Chunks already dispatched finish before the job is reported
+                        job.wait()
+            except Exception as e:
+                job.error = e
+            finally:
+                with self._changed:
+                    self._running -= 1
+                    self._changed.notify_all()
+            if self.on_job_done:
+                self.on_job_done(job)
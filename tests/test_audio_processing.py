@@ -0,0 +1,57 @@
+import tracemalloc
+import wave
+
+import numpy as np
+
+from audio_processing import read_wav_chunks
+
+SAMPLE_RATE = 44100
+
+
+def write_long_wav(path, seconds):
+    """A stereo 16-bit 44.1 kHz tone, written one second at a time"""
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    second = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    frames = np.column_stack([second, second]).tobytes()
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for _ in range(seconds):
+            f.writeframes(frames)
+
+
+def peak_while_reading(path):
+    tracemalloc.start()
+    try:
+        chunks = 0
+        for chunk in read_wav_chunks(str(path), chunk_duration_ms=5000):
+            assert chunk.sample_width == 2
+            chunks += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return chunks, peak
+
+
+def test_read_wav_chunks_peak_memory_is_flat(tmp_path):
+    # 10 minutes is about 106 MB of PCM; 5 s windows are under 1 MB each
+    path = tmp_path / "long.wav"
+    write_long_wav(path, 600)
+
+    chunks, peak = peak_while_reading(path)
+
+    assert chunks == 120
+    assert peak < 8 * 1024 * 1024
+
+
+def test_read_wav_chunks_peak_memory_does_not_grow_with_duration(tmp_path):
+    short_path = tmp_path / "short.wav"
+    long_path = tmp_path / "long.wav"
+    write_long_wav(short_path, 60)
+    write_long_wav(long_path, 600)
+
+    _, short_peak = peak_while_reading(short_path)
+    _, long_peak = peak_while_reading(long_path)
+
+    assert long_peak < short_peak * 1.5
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+import speech_recognition as sr
+
+from concurrency import AdaptiveLimiter, Hedger
+from recognizers import StubBackend
+
+SILENCE = sr.AudioData(b"\0" * 3200, 16000, 2)
+SPEECH = sr.AudioData(b"\1\0" * 1600, 16000, 2)
+
+
+def warmed_hedger(limiter, budget=1.0):
+    """A hedger whose hedge delay is about 10 ms"""
+    hedger = Hedger(
+        percentile=50,
+        budget=budget,
+        max_workers=4,
+        min_samples=5,
+        limiter=limiter,
+        is_throttled=lambda error: isinstance(error, sr.RequestError),
+    )
+    fast = StubBackend(latency=0.01)
+    for _ in range(5):
+        hedger.call(fast.recognize, SPEECH)
+    return hedger
+
+
+def wait_idle(limiter):
+    # The hedge's slot is released from its done callback
+    deadline = time.monotonic() + 2
+    while limiter.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert limiter.in_flight == 0
+
+
+def test_no_speech_hedge_keeps_the_limit():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    hedger = warmed_hedger(limiter)
+    slow = StubBackend(tail_latency=0.2, tail_rate=1.0)
+    with pytest.raises(sr.UnknownValueError):
+        hedger.call(slow.recognize, SILENCE)
+    wait_idle(limiter)
+    assert hedger.hedges == 1
+    assert limiter.limit >= 4
+    hedger.shutdown()
+
+
+def test_throttled_hedge_lowers_the_limit():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    hedger = warmed_hedger(limiter)
+
+    def throttled(audio):
+        time.sleep(0.2)
+        raise sr.RequestError("429 Too Many Requests")
+
+    with pytest.raises(sr.RequestError):
+        hedger.call(throttled, SPEECH)
+    wait_idle(limiter)
+    assert hedger.hedges == 1
+    assert limiter.limit == 2
+    hedger.shutdown()
+
+
+def test_hedges_stay_within_budget_and_limit():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    hedger = warmed_hedger(limiter, budget=0.25)
+    slow = StubBackend(tail_latency=0.05, tail_rate=1.0)
+    for _ in range(15):
+        text, _ = hedger.call(slow.recognize, SPEECH)
+        assert text.startswith("stub")
+    wait_idle(limiter)
+    assert 0 < hedger.hedges <= 0.25 * hedger.calls
+
+    # No free slot, so no duplicate and nothing taken from the budget
+    tokens = [limiter.try_acquire() for _ in range(limiter.limit)]
+    hedges = hedger.hedges
+    hedger.call(slow.recognize, SPEECH)
+    assert hedger.hedges == hedges
+    for token in tokens:
+        limiter.release(token)
+    hedger.shutdown()
@@ -0,0 +1,195 @@
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+import live
+from live import (
+    PhrasePipeline,
+    PhraseStats,
+    StreamingTranscriber,
+    WavReplaySource,
+    recognize_phrase,
+)
+from recognizers import StubBackend
+
+SAMPLE_RATE = 16000
+# Seconds of tone after each pause; pauses are longer than end_silence_ms
+TONES = (1.5, 2.5, 1.0, 3.0)
+PAUSE = 0.8
+
+
+def write_tone_wav(path):
+    parts = []
+    for seconds in TONES:
+        parts.append(np.zeros(int(PAUSE * SAMPLE_RATE)))
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        parts.append(0.3 * np.sin(2 * np.pi * 220 * t))
+    parts.append(np.zeros(int(PAUSE * SAMPLE_RATE)))
+    samples = (np.concatenate(parts) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+
+class YieldingReplaySource(WavReplaySource):
+    """Replays as fast as possible, but gives other threads a turn per frame"""
+
+    def __iter__(self):
+        for frame in super().__iter__():
+            yield frame
+            time.sleep(0.001)
+
+
+def test_streaming_replay_end_to_end(tmp_path):
+    path = tmp_path / "tones.wav"
+    write_tone_wav(path)
+    backend = StubBackend()
+    events = []
+    lock = threading.Lock()
+
+    def record(kind, index, text):
+        with lock:
+            events.append((kind, index, text))
+
+    phrases = PhrasePipeline(
+        lambda phrase: (phrase[0], backend.recognize(phrase[1])[0]),
+        lambda result: record("final", *result),
+    )
+    transcriber = StreamingTranscriber(
+        YieldingReplaySource(str(path), realtime=False),
+        backend,
+        on_utterance=lambda index, audio: phrases.submit((index, audio)),
+        on_partial=lambda index, text: record("partial", index, text),
+        partial_interval_ms=300,
+    )
+    transcriber.run()
+    phrases.close(wait=True)
+
+    assert transcriber.utterances == len(TONES)
+    finals = [index for kind, index, _ in events if kind == "final"]
+    assert finals == list(range(len(TONES)))
+    for index in range(len(TONES)):
+        kinds = [kind for kind, i, _ in events if i == index]
+        assert "partial" in kinds
+        assert kinds.index("partial") < kinds.index("final")
+
+
+def blocked_pipeline(**kwargs):
+    """A one-worker pipeline that holds its first phrase until released"""
+    release = threading.Event()
+    delivered = []
+
+    def process(phrase):
+        if phrase == "first":
+            release.wait(5)
+        return phrase
+
+    phrases = PhrasePipeline(process, delivered.append, workers=1, **kwargs)
+    phrases.submit("first")
+    deadline = time.monotonic() + 2
+    while not phrases.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return phrases, release, delivered
+
+
+def test_overload_drops_the_oldest_waiting_phrase():
+    phrases, release, delivered = blocked_pipeline(max_queue=2)
+    for phrase in ("a", "b", "c"):
+        phrases.submit(phrase)
+    assert phrases.waiting == 2
+    release.set()
+    phrases.close(wait=True)
+    assert delivered == ["first", "b", "c"]
+    assert phrases.dropped == 1
+
+
+def test_overload_merges_the_waiting_phrases():
+    phrases, release, delivered = blocked_pipeline(
+        max_queue=2, policy="merge", merge="+".join
+    )
+    for phrase in ("a", "b", "c"):
+        phrases.submit(phrase)
+    assert phrases.waiting == 1
+    release.set()
+    phrases.close(wait=True)
+    assert delivered == ["first", "a+b+c"]
+    assert phrases.merged == 2
+
+
+def test_results_are_delivered_in_capture_order():
+    delivered = []
+
+    def process(index):
+        # Later phrases finish first
+        time.sleep(0.02 * (5 - index))
+        if index == 2:
+            raise ValueError("bad phrase")
+        return index
+
+    phrases = PhrasePipeline(process, delivered.append, workers=5, max_queue=5)
+    for index in range(5):
+        phrases.submit(index)
+    phrases.close(wait=True)
+    assert delivered[:2] == [0, 1] and delivered[3:] == [3, 4]
+    assert isinstance(delivered[2], ValueError)
+
+
+class ScriptedBackend:
+    """Answers each call with the next result, raising it if it is an error"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def recognize(self, audio, language="en-US"):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer, 1.0
+
+
+def tone(seconds=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+    return sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2)
+
+
+def test_recognize_phrase_outcomes(monkeypatch):
+    monkeypatch.setattr(live, "backoff_delay", lambda attempt: 0)
+    stats = PhraseStats()
+    quiet = sr.AudioData(bytes(SAMPLE_RATE), SAMPLE_RATE, 2)
+
+    backend = ScriptedBackend()
+    assert recognize_phrase(backend, quiet, stats=stats) is None
+    assert backend.calls == 0
+
+    backend = ScriptedBackend(sr.UnknownValueError())
+    assert recognize_phrase(backend, tone(), stats=stats) is None
+    assert backend.calls == 1
+
+    backend = ScriptedBackend(sr.RequestError("503"), sr.RequestError("503"), "hi")
+    assert recognize_phrase(backend, tone(), stats=stats) == "hi"
+    assert backend.calls == 3
+
+    backend = ScriptedBackend(*[sr.RequestError("503")] * 3)
+    with pytest.raises(sr.RequestError):
+        recognize_phrase(backend, tone(), stats=stats, max_retries=2)
+    assert backend.calls == 3
+
+    assert stats.outcomes == {
+        "silent": 1,
+        "no_speech": 1,
+        "recognized": 1,
+        "failed": 1,
+    }
+    assert stats.calls == 7
+    assert stats.retries == 4
+    # A silent phrase and a "no speech" answer would each have cost three calls
+    assert stats.calls_saved == 3 + 2
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pyttsx3")
+
+from tts import SpeechWorker  # noqa: E402
+
+
+class FakeEngine:
+    """Records what is said; the first utterance holds until ``release`` is set"""
+
+    def __init__(self):
+        self.said = []
+        self.speaking = threading.Event()
+        self.release = threading.Event()
+        self._callbacks = {}
+        self._text = None
+        self._stopped = False
+
+    def connect(self, name, callback):
+        self._callbacks[name] = callback
+
+    def setProperty(self, name, value):
+        pass
+
+    def getProperty(self, name):
+        return None
+
+    def say(self, text):
+        self._text = text
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        self._stopped = False
+        self.said.append(self._text)
+        self._callbacks["started-utterance"]("utterance")
+        location = 0
+        for word in self._text.split():
+            self._callbacks["started-word"]("utterance", location, len(word))
+            if self._stopped:
+                break
+            self.speaking.set()
+            self.release.wait(5)
+            location += len(word) + 1
+
+
+def busy_worker(**kwargs):
+    """A worker in the middle of speaking "first", plus its engine"""
+    engine = FakeEngine()
+    worker = SpeechWorker(engine_factory=lambda: engine, **kwargs)
+    worker.speak("first")
+    assert engine.speaking.wait(2)
+    return worker, engine
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 2
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_full_queue_drops_the_oldest():
+    worker, engine = busy_worker(max_queue=2, coalesce_chars=0)
+    for text in ("a", "b", "c"):
+        worker.speak(text)
+    assert worker.waiting == 2
+    engine.release.set()
+    wait_for(lambda: worker.spoken == 3)
+    assert engine.said == ["first", "b", "c"]
+    assert worker.dropped == 1
+    assert len(worker.latencies) == 3
+    worker.close()
+
+
+def test_short_utterances_are_coalesced():
+    worker, engine = busy_worker(max_queue=5)
+    worker.speak("good")
+    worker.speak("morning")
+    worker.speak("a sentence that is long enough to be spoken alone")
+    worker.speak("faster", rate=200)
+    worker.speak("slower")
+    engine.release.set()
+    wait_for(lambda: worker.spoken == 5)
+    assert engine.said == [
+        "first",
+        "good morning",
+        "a sentence that is long enough to be spoken alone",
+        "faster",
+        "slower",
+    ]
+    assert worker.coalesced == 1
+    worker.close()
+
+
+def test_stale_utterances_are_skipped():
+    worker, engine = busy_worker(max_age=0.05)
+    worker.speak("old news")
+    time.sleep(0.1)
+    engine.release.set()
+    worker.speak("fresh")
+    wait_for(lambda: worker.spoken == 2)
+    assert engine.said == ["first", "fresh"]
+    assert worker.stale == 1
+    worker.close()
+
+
+def test_new_text_interrupts_at_the_next_word():
+    engine = FakeEngine()
+    worker = SpeechWorker(interrupt=True, engine_factory=lambda: engine)
+    worker.speak("one two three four")
+    assert engine.speaking.wait(2)
+    worker.speak("next")
+    engine.release.set()
+    wait_for(lambda: worker.spoken == 2)
+    assert engine.said == ["one two three four", "next"]
+    assert worker.interrupted == 1
+    worker.close()
+
+
+class BrokenEngine(FakeEngine):
+    def say(self, text):
+        raise RuntimeError("no voice")
+
+
+def test_engine_errors_are_reported():
+    errors = []
+    engine = BrokenEngine()
+    worker = SpeechWorker(on_error=errors.append, engine_factory=lambda: engine)
+    worker.speak("hello")
+    wait_for(lambda: errors)
+    assert str(errors[0]) == "no voice"
+    assert worker.spoken == 0
+    worker.close()
@@ -0,0 +1,144 @@
+import json
+
+from translation import is_marker
+
+EXPORT_FORMATS = ("txt", "srt", "vtt", "jsonl")
+
+
+class Segment:
+    """One recognized span of audio and its translations"""
+
+    __slots__ = ("index", "start_ms", "end_ms", "text", "confidence", "translations")
+
+    def __init__(self, index, start_ms, end_ms, text=None, confidence=None):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        self.confidence = confidence
+        # Language name -> translated text
+        self.translations = {}
+
+    def text_in(self, target_lang=None):
+        if target_lang is None:
+            return self.text or ""
+        return self.translations.get(target_lang, "")
+
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "start_ms": self.start_ms,
+            "end_ms": self.end_ms,
+            "text": self.text,
+            "confidence": self.confidence,
+            "translations": self.translations,
+        }
+
+
+class Transcript:
+    """Segments of one recording, kept by index"""
+
+    def __init__(self):
+        self.segments = {}
+        # Languages the segments have been (or are being) translated into
+        self.languages = []
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __getitem__(self, index):
+        return self.segments[index]
+
+    def add_segment(self, index, start_ms, end_ms):
+        segment = Segment(index, start_ms, end_ms)
+        self.segments[index] = segment
+        return segment
+
+    def add_language(self, target_lang):
+        if target_lang not in self.languages:
+            self.languages.append(target_lang)
+
+    def ordered(self):
+        return [self.segments[index] for index in sorted(self.segments)]
+
+    def texts(self, target_lang=None):
+        return [segment.text_in(target_lang) for segment in self.ordered()]
+
+    def set_translations(self, target_lang, texts):
+        """Attach a list of translations, one per segment in order"""
+        for segment, text in zip(self.ordered(), texts):
+            segment.translations[target_lang] = text
+        self.add_language(target_lang)
+
+
+def _timestamp(ms, separator):
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}"
+
+
+def to_text(transcript, target_lang=None):
+    return "\n".join(transcript.texts(target_lang))
+
+
+def to_srt(transcript, target_lang=None):
+    lines = []
+    number = 0
+    for segment in transcript.ordered():
+        text = segment.text_in(target_lang)
+        # Silence and error markers are not worth a subtitle
+        if is_marker(text):
+            continue
+        number += 1
+        lines.append(
+            f"{number}\n{_timestamp(segment.start_ms, ',')} --> "
+            f"{_timestamp(segment.end_ms, ',')}\n{text}\n"
+        )
+    return "\n".join(lines)
+
+
+def to_vtt(transcript, target_lang=None):
+    lines = ["WEBVTT\n"]
+    for segment in transcript.ordered():
+        text = segment.text_in(target_lang)
+        if is_marker(text):
+            continue
+        lines.append(
+            f"{_timestamp(segment.start_ms, '.')} --> "
+            f"{_timestamp(segment.end_ms, '.')}\n{text}\n"
+        )
+    return "\n".join(lines)
+
+
+def to_jsonl(transcript, target_lang=None):
+    """Every segment with all of its translations, one JSON object per line"""
+    return "".join(
+        json.dumps(segment.to_dict(), ensure_ascii=False) + "\n"
+        for segment in transcript.ordered()
+    )
+
+
+WRITERS = {"txt": to_text, "srt": to_srt, "vtt": to_vtt, "jsonl": to_jsonl}
+
+
+def export_transcript(transcript, base_path, formats=EXPORT_FORMATS, languages=None):
+    """Write ``base_path.<ext>`` plus ``base_path.<language>.<ext>`` per language
+
+    JSONL already holds every translation, so it is written once.
+    Returns the paths written.
+    """
+    if languages is None:
+        languages = transcript.languages
+    paths = []
+    for ext in formats:
+        targets = [None] if ext == "jsonl" else [None, *languages]
+        for target_lang in targets:
+            if target_lang is None:
+                path = f"{base_path}.{ext}"
+            else:
+                path = f"{base_path}.{target_lang.lower()}.{ext}"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(WRITERS[ext](transcript, target_lang))
+            paths.append(path)
+    return paths
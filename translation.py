@@ -0,0 +1,151 @@
+import concurrent.futures
+import re
+import time
+
+from deep_translator import GoogleTranslator
+
+# Google rejects requests over 5000 characters
+MAX_BATCH_CHARS = 4500
+
+SENTENCE_END = re.compile(r"(?<=[.!?。؟])\s+")
+
+
+def language_code(target_lang):
+    return (
+        GoogleTranslator()
+        .get_supported_languages(as_dict=True)
+        .get(target_lang.lower(), target_lang.lower())
+    )
+
+
+def is_marker(text):
+    """Placeholders such as "[Silence]" are kept as they are"""
+    return not text or (text.startswith("[") and text.endswith("]"))
+
+
+def split_text(text, max_chars=MAX_BATCH_CHARS):
+    """Split text into pieces under ``max_chars`` on sentence, then word, breaks"""
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    for sentence in SENTENCE_END.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if pieces and len(pieces[-1]) + 1 + len(sentence) <= max_chars:
+            pieces[-1] = f"{pieces[-1]} {sentence}"
+        elif sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def make_batches(segments, max_chars=MAX_BATCH_CHARS):
+    """Group segment pieces into requests of at most ``max_chars`` characters
+
+    Each batch is a list of ``(segment_index, piece)`` so results can be put
+    back together in the original order.
+    """
+    batches = []
+    batch = []
+    size = 0
+    for index, segment in enumerate(segments):
+        if is_marker(segment):
+            continue
+        # Pieces travel newline-separated, so they must not contain newlines
+        for piece in split_text(" ".join(segment.split()), max_chars):
+            if batch and size + len(piece) + 1 > max_chars:
+                batches.append(batch)
+                batch = []
+                size = 0
+            batch.append((index, piece))
+            size += len(piece) + 1
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def translate_segments(
+    segments, target_lang, cache=None, max_chars=MAX_BATCH_CHARS, workers=4, retries=3
+):
+    """Translate a list of segments concurrently, returning them in order
+
+    Segments are packed into size-bounded batches that are translated in
+    parallel with per-batch retries. A batch that still fails only loses
+    its own segments, which are returned as "[Translation failed: ...]".
+    """
+    lang_code = language_code(target_lang)
+    batches = make_batches(segments, max_chars)
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _translate_batch,
+                [piece for _, piece in batch],
+                lang_code,
+                cache,
+                retries,
+            ): batch_index
+            for batch_index, batch in enumerate(batches)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            batch_index = futures[future]
+            try:
+                results[batch_index] = future.result()
+            except Exception as e:
+                results[batch_index] = [f"[Translation failed: {e}]"] * len(
+                    batches[batch_index]
+                )
+    translated = [[segment] if is_marker(segment) else [] for segment in segments]
+    for batch_index, batch in enumerate(batches):
+        for (index, _), text in zip(batch, results[batch_index]):
+            translated[index].append(text)
+    return [" ".join(pieces) for pieces in translated]
+
+
+def translate_segment(text, lang_code, cache=None, retries=3):
+    """Translate a single segment, e.g. as soon as it has been recognized"""
+    if is_marker(text):
+        return text
+    pieces = split_text(" ".join(text.split()))
+    return " ".join(_translate_batch(pieces, lang_code, cache, retries))
+
+
+def _translate_batch(pieces, lang_code, cache, retries):
+    translator = GoogleTranslator(source="auto", target=lang_code)
+    results = [None] * len(pieces)
+    missing = []
+    for i, piece in enumerate(pieces):
+        cached = cache.get_translation(piece, "auto", lang_code) if cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.append(i)
+    if missing:
+        texts = [pieces[i] for i in missing]
+        for i, text in zip(missing, _request(translator, texts, retries)):
+            results[i] = text
+            if cache:
+                cache.put_translation(pieces[i], "auto", lang_code, text)
+    return results
+
+
+def _request(translator, texts, retries):
+    """Translate a batch in one call, retrying with exponential backoff
+
+    The pieces are sent joined by newlines; if the reply does not split back
+    into the same number of lines, ``translate_batch`` is used instead.
+    """
+    for attempt in range(retries + 1):
+        try:
+            joined = translator.translate("\n".join(texts))
+            lines = joined.split("\n") if joined else []
+            if len(lines) == len(texts):
+                return [line.strip() for line in lines]
+            return translator.translate_batch(texts)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(0.5 * 2**attempt)
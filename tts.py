@@ -0,0 +1,263 @@
+import collections
+import os
+import statistics
+import threading
+import time
+
+import pyttsx3
+
+from caches import SpeechCache
+
+
+class Utterance:
+    """Text to speak with the voice settings chosen when it was queued"""
+
+    __slots__ = ("text", "rate", "volume", "queued_at")
+
+    def __init__(self, text, rate=150, volume=0.9, queued_at=None):
+        self.text = text
+        self.rate = rate
+        self.volume = volume
+        self.queued_at = time.monotonic() if queued_at is None else queued_at
+
+
+class SpeechWorker:
+    """Speaks queued text on its own thread, which owns the pyttsx3 engine
+
+    ``speak()`` returns at once, so the caller never waits for audio. At most
+    ``max_queue`` utterances wait; the oldest is dropped when another
+    arrives. Utterances queued more than ``max_age`` seconds ago are skipped,
+    since the speaker has moved on. Waiting utterances shorter than
+    ``coalesce_chars`` are spoken together with the same voice settings.
+    With ``interrupt`` new text cuts off the one being spoken at the next
+    word. The delay from ``speak()`` to the start of audio is kept in
+    ``latencies``. Engine errors go to ``on_error(exception)``, called from
+    the worker thread.
+
+    With a ``cache`` (a SpeechCache), a repeated phrase is played straight
+    from disk with pygame. New phrases are spoken directly, then saved with
+    ``save_to_file`` once the worker has nothing else to say, as are the
+    phrases given to ``prewarm()``.
+    """
+
+    def __init__(
+        self,
+        max_queue=3,
+        max_age=10.0,
+        coalesce_chars=40,
+        interrupt=False,
+        on_error=None,
+        cache=None,
+        engine_factory=pyttsx3.init,
+    ):
+        self.max_queue = max_queue
+        self.max_age = max_age
+        self.coalesce_chars = coalesce_chars
+        self.interrupt = interrupt
+        self.on_error = on_error
+        self.cache = cache
+        self.spoken = 0
+        self.dropped = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.interrupted = 0
+        self.latencies = []
+        self._engine_factory = engine_factory
+        self._engine = None
+        self._queue = collections.deque()
+        # Phrases to synthesize into the cache when nothing is queued
+        self._warm = collections.deque()
+        self._current = None
+        self._stop_current = False
+        self._synthesizing = False
+        self._closed = False
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def waiting(self):
+        return len(self._queue)
+
+    def speak(self, text, rate=150, volume=0.9):
+        if not text or not text.strip():
+            return
+        with self._changed:
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(Utterance(text, rate, volume))
+            if self.interrupt and self._current is not None:
+                self._stop_current = True
+            self._changed.notify()
+
+    def prewarm(self, texts, rate=150, volume=0.9):
+        """Synthesize phrases into the cache ahead of time"""
+        with self._changed:
+            self._warm.extend(
+                Utterance(text, rate, volume) for text in texts if text.strip()
+            )
+            self._changed.notify()
+
+    def close(self):
+        """Stop after the utterance being spoken; queued ones are discarded"""
+        with self._changed:
+            self._closed = True
+            self._queue.clear()
+            self._warm.clear()
+            self._changed.notify()
+
+    def summary(self):
+        if not self.latencies:
+            return "nothing spoken"
+        text = (
+            f"{self.spoken} spoken, median {statistics.median(self.latencies):.2f}s "
+            f"from translation to audio"
+        )
+        for label, count in (
+            ("stale", self.stale),
+            ("dropped", self.dropped),
+            ("coalesced", self.coalesced),
+            ("interrupted", self.interrupted),
+        ):
+            if count:
+                text += f", {count} {label}"
+        if self.cache and self.cache.hits:
+            text += f", {self.cache.hits} from cache"
+        return text
+
+    def _next(self):
+        """Take the next utterance and whether it is only being pre-warmed
+
+        Returns ``(None, False)`` once closed.
+        """
+        with self._changed:
+            while True:
+                while not self._queue and not self._warm and not self._closed:
+                    self._changed.wait()
+                if self._closed:
+                    return None, False
+                if not self._queue:
+                    return self._warm.popleft(), True
+                utterance = self._queue.popleft()
+                if time.monotonic() - utterance.queued_at > self.max_age:
+                    self.stale += 1
+                    continue
+                while (
+                    self._queue
+                    and len(utterance.text) < self.coalesce_chars
+                    and len(self._queue[0].text) < self.coalesce_chars
+                    and self._queue[0].rate == utterance.rate
+                    and self._queue[0].volume == utterance.volume
+                ):
+                    following = self._queue.popleft()
+                    # Timed from the earlier of the two
+                    utterance = Utterance(
+                        f"{utterance.text} {following.text}",
+                        utterance.rate,
+                        utterance.volume,
+                        utterance.queued_at,
+                    )
+                    self.coalesced += 1
+                self._current = utterance
+                self._stop_current = False
+                return utterance, False
+
+    def _run(self):
+        engine = self._engine = self._engine_factory()
+        engine.connect("started-utterance", self._on_started)
+        engine.connect("started-word", self._on_word)
+        mixer = self._init_mixer() if self.cache else None
+        while True:
+            utterance, warming = self._next()
+            if utterance is None:
+                return
+            try:
+                if warming:
+                    if mixer:
+                        self._fill_cache(engine, utterance)
+                    continue
+                path = self._cached_path(engine, utterance) if mixer else None
+                if path is None or not self._play(mixer, path):
+                    engine.setProperty("rate", utterance.rate)
+                    engine.setProperty("volume", utterance.volume)
+                    engine.say(utterance.text)
+                    engine.runAndWait()
+                    if mixer and path is None:
+                        # Cached once nothing else is waiting to be spoken
+                        with self._changed:
+                            self._warm.append(utterance)
+                self.spoken += 1
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                with self._changed:
+                    self._current = None
+
+    def _init_mixer(self):
+        """pygame's mixer, or None to speak through the engine without the cache"""
+        try:
+            import pygame
+        except ImportError:
+            error = RuntimeError("The speech cache needs 'pip install pygame'")
+        else:
+            try:
+                pygame.mixer.init()
+                return pygame.mixer
+            except Exception as e:
+                error = e
+        if self.on_error:
+            self.on_error(error)
+        return None
+
+    def _key(self, engine, utterance):
+        voice = engine.getProperty("voice")
+        return SpeechCache.key(utterance.text, voice, utterance.rate, utterance.volume)
+
+    def _cached_path(self, engine, utterance):
+        """Return the cached audio for an utterance, or None on a miss"""
+        return self.cache.get(self._key(engine, utterance))
+
+    def _fill_cache(self, engine, utterance):
+        key = self._key(engine, utterance)
+        # Not a use, so neither counted nor refreshed
+        if os.path.exists(self.cache.path(key)):
+            return
+        partial_path = self.cache.partial_path(key)
+        engine.setProperty("rate", utterance.rate)
+        engine.setProperty("volume", utterance.volume)
+        engine.save_to_file(utterance.text, partial_path)
+        self._synthesizing = True
+        try:
+            engine.runAndWait()
+        finally:
+            self._synthesizing = False
+        self.cache.put(key, partial_path)
+
+    def _play(self, mixer, path):
+        """Play a cached file; False if no mixer channel was free"""
+        channel = mixer.Sound(path).play()
+        if channel is None:
+            return False
+        self._on_started(None)
+        while channel.get_busy():
+            if self._stop_current:
+                self._stop_current = False
+                self.interrupted += 1
+                channel.stop()
+                break
+            time.sleep(0.02)
+        return True
+
+    def _on_started(self, name):
+        utterance = self._current
+        if utterance is not None and not self._synthesizing:
+            self.latencies.append(time.monotonic() - utterance.queued_at)
+
+    def _on_word(self, name, location, length):
+        # Engine callbacks run on the worker thread, inside runAndWait
+        if self._stop_current and not self._synthesizing:
+            self._stop_current = False
+            self.interrupted += 1
+            self._engine.stop()